@@ -0,0 +1,92 @@
+import wave
+
+from audio_meta import audio_info
+
+# --- Narration assembly: every chunk read once into one preallocated buffer ---
+DEFAULT_SAMPLE_RATE = 22050
+
+
+def read_pcm(path):
+    """(int16 samples shaped (frames, channels), sample rate) from a PCM WAV"""
+    import numpy as np
+
+    with wave.open(str(path), 'rb') as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        frames = w.readframes(w.getnframes())
+
+    if width == 1:
+        samples = ((np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8)
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype='<i2')
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        samples = (raw[:, 2].astype(np.int8).astype(np.int16) << 8) | raw[:, 1].astype(np.int16)
+    elif width == 4:
+        samples = (np.frombuffer(frames, dtype='<i4') >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width * 8} bit")
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels), rate
+
+
+def _match_format(samples, rate, sample_rate, channels):
+    import numpy as np
+
+    if samples.shape[1] != channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = np.repeat(mono, channels, axis=1).astype(np.int16)
+    if rate != sample_rate and len(samples):
+        # Linear resample - TTS voices rarely differ, this only keeps odd files usable
+        count = int(round(len(samples) * sample_rate / rate))
+        positions = np.linspace(0, len(samples) - 1, count)
+        samples = np.stack([np.interp(positions, np.arange(len(samples)), samples[:, c])
+                            for c in range(channels)], axis=1).astype(np.int16)
+    return samples
+
+
+def assemble_narration(segments, sample_rate=None, channels=None):
+    """One contiguous int16 track from [("silence", seconds) | ("audio", path), ...]
+
+    The output buffer is sized up front from the WAV headers, silence is left as
+    zeros and each file's PCM is copied into its slice exactly once.
+    Returns (samples shaped (frames, channels), sample rate).
+    """
+    import numpy as np
+
+    infos = {value: audio_info(value) for kind, value in segments if kind == "audio"}
+    sample_rate = sample_rate or next((i.sample_rate for i in infos.values() if i.sample_rate),
+                                      DEFAULT_SAMPLE_RATE)
+    channels = channels or max((i.channels or 1 for i in infos.values()), default=1)
+
+    def segment_frames(kind, value):
+        if kind == "silence":
+            return int(round(value * sample_rate))
+        info = infos[value]
+        return int(round(info.duration * sample_rate)) + 1
+
+    buffer = np.zeros((sum(segment_frames(*segment) for segment in segments), channels), dtype=np.int16)
+    position = 0
+    for kind, value in segments:
+        if kind == "silence":
+            position += segment_frames(kind, value)
+            continue
+        samples, rate = read_pcm(value)
+        samples = _match_format(samples, rate, sample_rate, channels)
+        count = min(len(samples), len(buffer) - position)
+        buffer[position:position + count] = samples[:count]
+        position += count
+    return buffer[:position], sample_rate
+
+
+def write_wav(path, samples, sample_rate):
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(samples.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(samples.astype('<i2').tobytes())
+
+
+def narration_audio_clip(samples, sample_rate):
+    """moviepy clip over the in-memory track - the encoder reads one source, no temp file"""
+    from moviepy.audio.AudioClip import AudioArrayClip
+    return AudioArrayClip(samples.astype('float32') / 32768.0, fps=sample_rate)
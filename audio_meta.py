@@ -0,0 +1,119 @@
+import json
+import os
+import re
+import struct
+import subprocess
+import threading
+
+from runtime_tools import get_tool_path
+
+# --- Audio metadata: durations straight from the container header ---
+PCM_SUFFIXES = (".wav", ".wave")
+_FFMPEG_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+_memo = {}
+_memo_lock = threading.Lock()
+probe_stats = {"header": 0, "subprocess": 0, "memo": 0}
+
+
+class AudioInfo:
+    """Duration and format of one audio file"""
+
+    __slots__ = ("duration", "sample_rate", "channels", "bits", "frames", "source")
+
+    def __init__(self, duration, sample_rate=None, channels=None, bits=None, frames=None, source="header"):
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bits = bits
+        self.frames = frames
+        self.source = source
+
+
+def read_wav_header(path):
+    """AudioInfo from the RIFF fmt / data chunks - no decoding, no subprocess
+
+    Handles PCM, IEEE float and WAVE_FORMAT_EXTENSIBLE. A data chunk size of 0 or
+    0xFFFFFFFF (streamed writers that never patched the header) falls back to the
+    bytes actually on disk.
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff not in (b'RIFF', b'RF64') or wave_id != b'WAVE':
+            raise ValueError(f"Not a WAV file: {path}")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"WAV file has no data chunk: {path}")
+            chunk_id, size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', f.read(16))
+                f.seek(size - 16 + (size & 1), 1)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"WAV data chunk before fmt chunk: {path}")
+                if size in (0, 0xFFFFFFFF):
+                    size = os.path.getsize(path) - f.tell()
+                break
+            else:
+                f.seek(size + (size & 1), 1)  # Chunks are word aligned
+
+    _, channels, sample_rate, byte_rate, block_align, bits = fmt
+    if not sample_rate or not block_align:
+        raise ValueError(f"Invalid WAV fmt chunk: {path}")
+    frames = size // block_align
+    return AudioInfo(frames / sample_rate, sample_rate, channels, bits, frames)
+
+
+def probe_with_ffmpeg(path):
+    """Duration via ffprobe (or ffmpeg -i) - only for compressed formats"""
+    ffprobe = get_tool_path("ffprobe")
+    if ffprobe:
+        result = subprocess.run([ffprobe, "-v", "error", "-show_entries", "format=duration",
+                                 "-of", "json", str(path)], capture_output=True, text=True)
+        duration = json.loads(result.stdout or "{}").get("format", {}).get("duration")
+        if duration is not None:
+            return AudioInfo(float(duration), source="ffprobe")
+
+    ffmpeg = get_tool_path("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError(f"Can't probe {path}: not PCM WAV and no ffprobe / ffmpeg found")
+    result = subprocess.run([ffmpeg, "-hide_banner", "-i", str(path)], capture_output=True, text=True)
+    match = _FFMPEG_DURATION_RE.search(result.stderr)
+    if not match:
+        raise RuntimeError(f"ffmpeg reported no duration for {path}")
+    hours, minutes, seconds = match.groups()
+    return AudioInfo(int(hours) * 3600 + int(minutes) * 60 + float(seconds), source="ffmpeg")
+
+
+def audio_info(path):
+    """Memoized AudioInfo - keyed by (path, size, mtime) so a rewritten file is probed again"""
+    path = str(path)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _memo_lock:
+        info = _memo.get(key)
+        if info is not None:
+            probe_stats["memo"] += 1
+            return info
+
+    info = None
+    if path.lower().endswith(PCM_SUFFIXES):
+        try:
+            info = read_wav_header(path)
+            probe_stats["header"] += 1
+        except (ValueError, struct.error):
+            info = None
+    if info is None:
+        info = probe_with_ffmpeg(path)
+        probe_stats["subprocess"] += 1
+
+    with _memo_lock:
+        _memo[key] = info
+    return info
+
+
+def audio_duration(path):
+    return audio_info(path).duration
@@ -0,0 +1,122 @@
+"""
+bench_captions.py
+
+Captions per second for the two caption renderers on real chunk texts from the
+story corpus, wrapped exactly as the video creator wraps them:
+
+- imagemagick: moviepy TextClip(method='caption'), one ImageMagick call each
+- pillow cold: caption_renderer.render_caption with an empty render cache
+- pillow warm: the same captions again (part indicators, repeated runs)
+
+When ImageMagick is available the alpha masks of both renderers are compared
+too (mean absolute difference and size), to keep the look in check.
+
+Usage:
+python bench_captions.py
+"""
+
+import re
+import textwrap
+import time
+
+from bench_normalizer import load_corpus
+from caption_renderer import render_caption
+from text_normalizer import normalize_text
+
+# ===============================================
+# CONFIGURATION
+# ===============================================
+CAPTIONS = 200
+IMAGEMAGICK_CAPTIONS = 30  # Each one is a subprocess - keep the slow path short
+FONT = "Anton"
+FONTSIZE = 100
+COLOR = "white"
+STROKE_COLOR = "black"
+STROKE_WIDTH = 2
+WIDTH = 880
+WRAP_CHARS_PER_LINE = 20
+MIN_WORDS, MAX_WORDS = 8, 25
+# ===============================================
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def chunk_texts(limit):
+    """Sentence-grouped 8-25 word chunks, wrapped at WRAP_CHARS_PER_LINE"""
+    chunks = []
+    for story in load_corpus():
+        current = []
+        for sentence in _SENTENCE_RE.split(normalize_text(story.get('full_story', ''))):
+            current.extend(sentence.split())
+            if len(current) >= MIN_WORDS:
+                chunks.append(" ".join(current[:MAX_WORDS]))
+                current = []
+            if len(chunks) >= limit:
+                return [textwrap.fill(chunk, width=WRAP_CHARS_PER_LINE) for chunk in chunks]
+    return [textwrap.fill(chunk, width=WRAP_CHARS_PER_LINE) for chunk in chunks]
+
+
+def render_pillow(texts):
+    start = time.perf_counter()
+    for text in texts:
+        render_caption(text, FONT, FONTSIZE, COLOR, STROKE_COLOR, STROKE_WIDTH, WIDTH)
+    return time.perf_counter() - start
+
+
+def render_imagemagick(texts):
+    """(seconds, masks) or None when moviepy / ImageMagick can't be used"""
+    try:
+        from moviepy.editor import TextClip
+        from runtime_tools import ensure_imagemagick
+        ensure_imagemagick()
+    except Exception as e:
+        print(f"⚠️ ImageMagick path not available: {e}")
+        return None
+
+    masks = []
+    start = time.perf_counter()
+    for text in texts:
+        clip = TextClip(txt=text, fontsize=FONTSIZE, font=FONT, color=COLOR, stroke_color=STROKE_COLOR,
+                        stroke_width=STROKE_WIDTH, method='caption', align='center', size=(WIDTH, None))
+        masks.append(clip.mask.get_frame(0))
+        clip.close()
+    return time.perf_counter() - start, masks
+
+
+def compare_masks(texts, masks):
+    import numpy as np
+
+    diffs, heights = [], []
+    for text, reference in zip(texts, masks):
+        ours = render_caption(text, FONT, FONTSIZE, COLOR, STROKE_COLOR, STROKE_WIDTH, WIDTH)[..., 3] / 255.0
+        height = min(len(ours), len(reference))
+        diffs.append(float(np.abs(ours[:height] - reference[:height]).mean()))
+        heights.append(len(ours) / len(reference))
+    print(f"🔍 Alpha mean abs diff vs ImageMagick: {sum(diffs) / len(diffs):.3f} "
+          f"(height ratio {min(heights):.2f}-{max(heights):.2f})")
+
+
+def main():
+    texts = chunk_texts(CAPTIONS)
+    print(f"🧪 {len(texts)} chunk captions, {FONT} {FONTSIZE}px, {WIDTH}px wide")
+
+    render_caption.cache_clear()
+    cold = render_pillow(texts)
+    warm = render_pillow(texts)
+    imagemagick = render_imagemagick(texts[:IMAGEMAGICK_CAPTIONS])
+
+    print(f"\n📊 CAPTION RENDERING")
+    print(f"{'=' * 50}")
+    print(f"{'renderer':<22}{'captions':>10}{'seconds':>9}{'per sec':>9}")
+    if imagemagick:
+        seconds, masks = imagemagick
+        print(f"{'imagemagick':<22}{len(masks):>10}{seconds:>9.2f}{len(masks) / seconds:>9.1f}")
+    print(f"{'pillow (cold)':<22}{len(texts):>10}{cold:>9.2f}{len(texts) / cold:>9.1f}")
+    print(f"{'pillow (memoized)':<22}{len(texts):>10}{warm:>9.4f}{len(texts) / max(warm, 1e-9):>9.0f}")
+    if imagemagick:
+        print(f"\n⚡ Cold speedup: {(len(texts) / cold) / (len(masks) / seconds):.1f}x")
+        compare_masks(texts, masks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+bench_fetcher.py
+
+Offline benchmark for the fetch-and-filter path of EnhancedRedditStoryFetcher.
+Builds a synthetic snapshot corpus (10k+ submissions across SUBREDDITS), replays
+it through fetch_stories_by_tags via ReplayBackend and reports stories/sec plus
+the cost of the filter stage. No network or praw needed.
+
+Also compares listing mode against search mode (tag search queries, answered by
+ReplayBackend's local stand-in) on API requests and posts transferred per
+accepted story.
+
+To replay a real recording instead, capture one with
+    EnhancedRedditStoryFetcher(backend=RecordingBackend(PrawBackend(...), "reddit_snapshots"))
+and set SNAPSHOT_DIR below.
+
+Usage:
+python bench_fetcher.py
+"""
+
+import random
+import tempfile
+import time
+
+from reddit_backends import ReplayBackend, listing_file, write_snapshot
+from reddit_story_fetcher import EnhancedRedditStoryFetcher, SUBREDDITS, VIRAL_TAGS
+
+# ===============================================
+# CONFIGURATION
+# ===============================================
+SNAPSHOT_DIR = None  # Set to a recorded snapshot folder to replay real data
+SUBMISSIONS_PER_SUB = 300  # 38 subs x 300 = 11,400 synthetic submissions
+LIMIT_PER_SUB = SUBMISSIONS_PER_SUB // 2  # Fetcher lists limit_per_sub * 2 posts
+MIN_SCORE = 50
+RUNS = [
+    # (label, injected latency per request in seconds, max in flight, fetch mode)
+    ("no latency, sequential", 0.0, 1, "listing"),
+    ("no latency, 8 in flight", 0.0, 8, "listing"),
+    ("50 ms latency, sequential", 0.05, 1, "listing"),
+    ("50 ms latency, 8 in flight", 0.05, 8, "listing"),
+    ("search, 50 ms, 8 in flight", 0.05, 8, "search"),
+]
+# ===============================================
+
+TITLE_WORDS = ("my", "husband", "wife", "boyfriend", "girlfriend", "sister", "mom", "wedding",
+               "friend", "refused", "told", "found", "out", "ruined", "secret", "party", "money",
+               "house", "job", "after", "because", "years", "family", "trip", "birthday")
+QUESTION_STARTS = ("what", "how", "why", "should", "is")
+BODY_SENTENCES = ("I never thought this would happen to me.", "We had been together for years.",
+                  "Then everything changed in one night.", "My family still doesn't know.",
+                  "I'm not sure what to do anymore.", "Looking back, the signs were all there.")
+
+
+def synthetic_submission(rnd, sub, i):
+    words = [rnd.choice(TITLE_WORDS) for _ in range(rnd.randint(6, 14))]
+    if rnd.random() < 0.4:
+        words.insert(rnd.randrange(len(words)), rnd.choice(VIRAL_TAGS).lower())
+    if rnd.random() < 0.2:
+        words.insert(0, rnd.choice(QUESTION_STARTS))
+    title = " ".join(words).capitalize() + ("?" if rnd.random() < 0.1 else "")
+    body = " ".join(rnd.choice(BODY_SENTENCES) for _ in range(rnd.randint(0, 60)))
+    post_id = f"{sub.lower()[:4]}{i:05d}"
+    return {
+        "id": post_id,
+        "title": title,
+        "selftext": body,
+        "author": f"user_{rnd.randint(1, 5000)}",
+        "score": int(rnd.paretovariate(1.2) * 10),
+        "num_comments": rnd.randint(0, 400),
+        "url": f"https://www.reddit.com/r/{sub}/comments/{post_id}/",
+        "permalink": f"/r/{sub}/comments/{post_id}/",
+        "created_utc": 1754000000 + i * 60,
+    }
+
+
+def build_synthetic_corpus(snapshot_dir):
+    rnd = random.Random(1234)
+    total = 0
+    for sub in SUBREDDITS:
+        records = [synthetic_submission(rnd, sub, i) for i in range(SUBMISSIONS_PER_SUB)]
+        records.sort(key=lambda r: r["score"], reverse=True)  # Like a top/week listing
+        write_snapshot(listing_file(snapshot_dir, sub, "top", "week"), records)
+        total += len(records)
+    print(f"🧪 Synthetic corpus: {total:,} submissions in {len(SUBREDDITS)} subreddits")
+
+
+def run(label, snapshot_dir, latency, max_in_flight, fetch_mode):
+    fetcher = EnhancedRedditStoryFetcher(max_in_flight=max_in_flight, requests_per_minute=10 ** 9,
+                                         backend=ReplayBackend(snapshot_dir, latency=latency),
+                                         fetch_mode=fetch_mode)
+    fetcher.verbose = False
+
+    start = time.perf_counter()
+    stories = fetcher.fetch_stories_by_tags(limit_per_sub=LIMIT_PER_SUB, min_score=MIN_SCORE)
+    elapsed = time.perf_counter() - start
+    stats = fetcher.stats
+
+    return {
+        "label": label,
+        "elapsed": elapsed,
+        "stories": len(stories),
+        "scanned": stats["scanned"],
+        "transferred": stats["transferred"],
+        "filter": stats["filter_seconds"],
+        "requests": fetcher.request_budget.requests_made,
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_dir = SNAPSHOT_DIR or tmp
+        if SNAPSHOT_DIR is None:
+            build_synthetic_corpus(snapshot_dir)
+
+        results = [run(label, snapshot_dir, *settings) for label, *settings in RUNS]
+
+    print(f"\n📊 FETCHER BENCHMARK")
+    print(f"{'=' * 100}")
+    print(f"{'run':<28}{'wall s':>9}{'stories':>9}{'stories/s':>11}{'scanned/s':>12}"
+          f"{'filter ms':>11}{'µs/post':>9}{'requests':>10}")
+    for r in results:
+        print(f"{r['label']:<28}{r['elapsed']:>9.2f}{r['stories']:>9}{r['stories'] / r['elapsed']:>11,.0f}"
+              f"{r['scanned'] / r['elapsed']:>12,.0f}{r['filter'] * 1000:>11.1f}"
+              f"{r['filter'] * 1e6 / max(1, r['scanned']):>9.1f}{r['requests']:>10}")
+
+    print(f"\n📊 LISTING vs SEARCH (per accepted story)")
+    print(f"{'=' * 100}")
+    print(f"{'run':<28}{'requests':>10}{'req/story':>11}{'posts over wire':>17}{'posts/story':>13}")
+    for r in results:
+        stories = max(1, r['stories'])
+        print(f"{r['label']:<28}{r['requests']:>10}{r['requests'] / stories:>11.3f}"
+              f"{r['transferred']:>17,}{r['transferred'] / stories:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
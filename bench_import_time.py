@@ -0,0 +1,77 @@
+"""
+bench_import_time.py
+
+Import-time benchmark for the modules worker processes and quick CLI commands
+load. Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+(best of IMPORT_RUNS), prints the heaviest imports and checks the total against
+IMPORT_BUDGET_MS. Also fails if a heavy media library is imported eagerly - those
+must only load once a render starts.
+
+Usage:
+python bench_import_time.py [module ...]
+"""
+
+import subprocess
+import sys
+
+# ===============================================
+# CONFIGURATION
+# ===============================================
+MODULES = ["standalone_video_creator", "story_store", "text_normalizer"]
+IMPORT_BUDGET_MS = 150  # Cumulative import time per module, best of IMPORT_RUNS
+IMPORT_RUNS = 5
+TOP_IMPORTS = 8
+HEAVY_MODULES = ("moviepy", "nltk", "pydub", "numpy", "pyttsx3", "praw", "imageio", "PIL")
+# ===============================================
+
+
+def measure(module):
+    """(cumulative µs of the module, {imported name: cumulative µs}) for one fresh interpreter"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports[name.strip()] = int(cumulative)
+    return imports.get(module, 0), imports
+
+
+def main():
+    modules = sys.argv[1:] or MODULES
+    over_budget = []
+
+    print(f"\n📊 IMPORT TIME (best of {IMPORT_RUNS}, budget {IMPORT_BUDGET_MS} ms)")
+    print(f"{'=' * 70}")
+    for module in modules:
+        try:
+            runs = [measure(module) for _ in range(IMPORT_RUNS)]
+        except RuntimeError as e:
+            print(f"❌ {module}: {e}")
+            over_budget.append(module)
+            continue
+
+        total, imports = min(runs, key=lambda run: run[0])
+        heavy = sorted(name for name in imports if name.split(".")[0] in HEAVY_MODULES)
+        status = "✅" if total / 1000 <= IMPORT_BUDGET_MS and not heavy else "❌"
+        print(f"{status} {module:<32}{total / 1000:>9.1f} ms")
+
+        for name, cumulative in sorted(imports.items(), key=lambda item: item[1], reverse=True)[1:TOP_IMPORTS + 1]:
+            print(f"     {name:<40}{cumulative / 1000:>9.1f} ms")
+        if heavy:
+            print(f"   ⚠️ Heavy modules imported eagerly: {', '.join(heavy)}")
+        if status == "❌":
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"\n❌ Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print(f"\n✅ All modules import within {IMPORT_BUDGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+bench_karaoke.py
+
+Render cost of karaoke captions against today's chunk captions for one
+part-sized run of corpus chunks, in two stages:
+
+- build: rasterizing the caption images (render_caption per chunk, against the
+  word atlas: base block + one highlight sprite per word)
+- composite: per-frame blending of every caption layer active at t onto a
+  1080x1920 frame (every FRAME_STEP-th frame at 30 fps), the way
+  CompositeVideoClip blits masked clips (karaoke adds one word-sized layer)
+
+The karaoke total must stay within KARAOKE_BUDGET x the chunk total.
+
+When ffmpeg is installed the same layers are also rendered end to end by the
+ffmpeg backend (over a flat background and silent narration): chunk captions
+as one PNG input + overlay each, karaoke flattened by caption_track into one
+concat input (a frame per word) + one overlay, the way render_part_ffmpeg
+does it. That ratio is checked against the same budget.
+
+Usage:
+python bench_karaoke.py
+"""
+
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+from bench_captions import chunk_texts
+from caption_renderer import render_caption
+from ffmpeg_render import caption_png, caption_track, render_part
+from karaoke_captions import WordAtlas, karaoke_wrap, word_timings
+from runtime_tools import get_tool_path
+
+# ===============================================
+# CONFIGURATION
+# ===============================================
+CHUNKS = 30  # ~one 2-minute part
+SECONDS_PER_WORD = 60 / 230
+FPS = 30
+FRAME_STEP = 6  # Composite every 6th frame - same ratio, 1/6 of the wait
+FRAME_SIZE = (1920, 1080)
+FONT = "Anton"
+FONTSIZE = 100
+COLOR = "white"
+HIGHLIGHT_COLOR = "yellow"
+STROKE_COLOR = "black"
+STROKE_WIDTH = 2
+WIDTH = 880
+WRAP_CHARS_PER_LINE = 20
+KARAOKE_BUDGET = 1.2
+SAMPLE_RATE = 22050
+# ===============================================
+
+
+def timeline(texts):
+    """[(text, start, duration), ...] back to back at the TTS speaking rate"""
+    spans, position = [], 0.0
+    for text in texts:
+        duration = len(text.split()) * SECONDS_PER_WORD
+        spans.append((text, position, duration))
+        position += duration
+    return spans
+
+
+def composite_blit(frame, layer, x, y):
+    """CompositeVideoClip-style blit: mask * layer + (1 - mask) * frame on the layer's region"""
+    region = frame[y:y + layer.shape[0], x:x + layer.shape[1]]
+    mask = layer[..., 3:] / 255.0
+    region[:] = mask * layer[..., :3] + (1.0 - mask) * region
+
+
+def composite(layers, total):
+    """Seconds to blend every active (rgba, x, y, start, end) layer into each frame"""
+    import numpy as np
+
+    background = np.full(FRAME_SIZE + (3,), 40, dtype=np.uint8)
+    start = time.perf_counter()
+    for i in range(0, int(total * FPS), FRAME_STEP):
+        t = i / FPS
+        frame = background.copy()
+        for rgba, x, y, begin, end in layers:
+            if begin <= t < end:
+                composite_blit(frame, rgba, x, y)
+    return time.perf_counter() - start
+
+
+def ffmpeg_inputs(ffmpeg, total, work_dir):
+    """A short flat background clip (looped by the backend) and a silent narration WAV"""
+    import subprocess
+    import numpy as np
+    from audio_assembly import write_wav
+
+    background = work_dir / "background.mp4"
+    subprocess.run([ffmpeg, "-y", "-hide_banner", "-loglevel", "error", "-f", "lavfi",
+                    "-i", f"color=c=gray:s={FRAME_SIZE[1]}x{FRAME_SIZE[0]}:r={FPS}", "-t", "2",
+                    "-c:v", "libx264", str(background)], check=True)
+    narration = work_dir / "narration.wav"
+    write_wav(narration, np.zeros((int(total * SAMPLE_RATE), 1), dtype=np.int16), SAMPLE_RATE)
+    return background, narration
+
+
+def ffmpeg_render(layers, total, background, narration, work_dir, name, track=False):
+    """Seconds for the ffmpeg backend to write the caption images (PNGs or the flattened track) and encode the part"""
+    start = time.perf_counter()
+    if track:
+        timeline = [caption_track([{"rgba": rgba, "x": x, "y": y, "start": begin, "end": end}
+                                   for rgba, x, y, begin, end in layers], work_dir, name=name)]
+    else:
+        timeline = [{"image": caption_png(rgba, work_dir), "start": begin, "end": end, "x": x, "y": y}
+                    for rgba, x, y, begin, end in layers]
+    render_part(background, timeline, narration, total, work_dir / f"{name}.mp4", work_dir)
+    return time.perf_counter() - start
+
+
+def centered(rgba):
+    return (FRAME_SIZE[1] - rgba.shape[1]) // 2, (FRAME_SIZE[0] - rgba.shape[0]) // 2
+
+
+def chunk_layers(spans):
+    layers = []
+    for text, begin, duration in spans:
+        rgba = render_caption(textwrap.fill(text, width=WRAP_CHARS_PER_LINE), FONT, FONTSIZE, COLOR,
+                              STROKE_COLOR, STROKE_WIDTH, WIDTH)
+        layers.append((rgba, *centered(rgba), begin, begin + duration))
+    return layers
+
+
+def karaoke_layers(spans, atlas):
+    layers = []
+    for text, begin, duration in spans:
+        block, highlights = atlas.karaoke(karaoke_wrap(text, WRAP_CHARS_PER_LINE), WIDTH, COLOR, HIGHLIGHT_COLOR)
+        origin_x, origin_y = centered(block)
+        layers.append((block, origin_x, origin_y, begin, begin + duration))
+        for (_, word_start, word_duration), (sprite, x, y) in zip(word_timings(text, begin, duration), highlights):
+            layers.append((sprite, origin_x + x, origin_y + y, word_start, word_start + word_duration))
+    return layers
+
+
+def main():
+    spans = timeline(chunk_texts(CHUNKS))
+    total = spans[-1][1] + spans[-1][2]
+    words = sum(len(text.split()) for text, _, _ in spans)
+    print(f"🧪 {len(spans)} chunks, {words} words, {total:.1f}s at {FPS} fps")
+
+    load_start = time.perf_counter()
+    render_caption("warm up", FONT, FONTSIZE, COLOR, STROKE_COLOR, STROKE_WIDTH, WIDTH)  # Font lookup, once
+    print(f"🔤 Font lookup: {time.perf_counter() - load_start:.2f}s (shared, excluded)")
+
+    render_caption.cache_clear()
+    start = time.perf_counter()
+    chunk = chunk_layers(spans)
+    chunk_build = time.perf_counter() - start
+
+    atlas = WordAtlas(FONT, FONTSIZE, STROKE_COLOR, STROKE_WIDTH)
+    start = time.perf_counter()
+    karaoke = karaoke_layers(spans, atlas)
+    karaoke_build = time.perf_counter() - start
+
+    chunk_composite = composite(chunk, total)
+    karaoke_composite = composite(karaoke, total)
+
+    chunk_total = chunk_build + chunk_composite
+    karaoke_total = karaoke_build + karaoke_composite
+    ratio = karaoke_total / chunk_total
+
+    print(f"\n📊 CAPTION RENDER COST")
+    print(f"{'=' * 56}")
+    print(f"{'mode':<10}{'layers':>8}{'build s':>10}{'composite s':>14}{'total s':>10}")
+    print(f"{'chunk':<10}{len(chunk):>8}{chunk_build:>10.2f}{chunk_composite:>14.2f}{chunk_total:>10.2f}")
+    print(f"{'karaoke':<10}{len(karaoke):>8}{karaoke_build:>10.2f}{karaoke_composite:>14.2f}{karaoke_total:>10.2f}")
+    atlas.report()
+    status = "✅" if ratio <= KARAOKE_BUDGET else "⚠️"
+    print(f"{status} Karaoke / chunk: {ratio:.2f}x (budget {KARAOKE_BUDGET}x)")
+
+    ffmpeg = get_tool_path("ffmpeg")
+    if not ffmpeg:
+        print("⏭️ ffmpeg not found - ffmpeg backend not measured")
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        work_dir = Path(folder)
+        background, narration = ffmpeg_inputs(ffmpeg, total, work_dir)
+        chunk_ffmpeg = ffmpeg_render(chunk, total, background, narration, work_dir, "chunk")
+        karaoke_ffmpeg = ffmpeg_render(karaoke, total, background, narration, work_dir, "karaoke", track=True)
+    ffmpeg_ratio = (karaoke_build + karaoke_ffmpeg) / (chunk_build + chunk_ffmpeg)
+
+    print(f"\n📊 FFMPEG BACKEND (build + caption images + encode)")
+    print(f"{'=' * 56}")
+    print(f"{'chunk':<10}{len(chunk):>8} inputs{chunk_build + chunk_ffmpeg:>10.2f}s")
+    print(f"{'karaoke':<10}{1:>8} inputs{karaoke_build + karaoke_ffmpeg:>10.2f}s")
+    status = "✅" if ffmpeg_ratio <= KARAOKE_BUDGET else "⚠️"
+    print(f"{status} Karaoke / chunk (ffmpeg): {ffmpeg_ratio:.2f}x (budget {KARAOKE_BUDGET}x)")
+
+
+if __name__ == "__main__":
+    main()
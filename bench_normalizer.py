@@ -0,0 +1,122 @@
+"""
+bench_normalizer.py
+
+Measures what the text normalization stage saves on the existing story corpus:
+characters, words and estimated narration seconds (at WORDS_PER_MINUTE) that no
+longer go to TTS, plus parts saved against the 2-minute limit. Also times a cold
+pass against a cached pass through TextNormalizer.
+
+Reads whichever of viral_stories_full.jsonl / .json / .yaml exist, plus the
+story excerpts in viral_reddit_stories.txt (BoRU posts, heavy on boilerplate).
+
+Usage:
+python bench_normalizer.py
+"""
+
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from story_store import (load_stories_file, story_key, WORDS_PER_MINUTE, MAX_VIDEO_DURATION)
+from text_normalizer import TextNormalizer
+
+# ===============================================
+# CONFIGURATION
+# ===============================================
+STORY_FILES = ["viral_stories_full.jsonl", "viral_stories_full.json", "viral_stories_full.yaml"]
+TEXT_DUMP_FILE = "viral_reddit_stories.txt"
+CACHED_PASSES = 20
+# ===============================================
+
+_DUMP_STORY_RE = re.compile(r"^Title: (.*?)\n.*?^Content: (.*?)\n-{20,}", re.MULTILINE | re.DOTALL)
+
+
+def load_corpus():
+    stories, seen = [], set()
+    for name in STORY_FILES:
+        if not Path(name).exists():
+            continue
+        for story in load_stories_file(name):
+            key = story_key(story) or story.get('title')
+            if key not in seen:
+                seen.update((key, story.get('title')))
+                stories.append(story)
+
+    if Path(TEXT_DUMP_FILE).exists():
+        with open(TEXT_DUMP_FILE, 'r', encoding='utf-8') as f:
+            for title, content in _DUMP_STORY_RE.findall(f.read()):
+                if title not in seen:
+                    seen.add(title)
+                    stories.append({"title": title, "full_story": content})
+    return stories
+
+
+def narration(story):
+    return f"{story.get('title', '')}. {story.get('full_story', '')}"
+
+
+def seconds(text):
+    return len(text.split()) * 60 / WORDS_PER_MINUTE
+
+
+def parts(text):
+    estimated = seconds(text)
+    return 1 if estimated <= MAX_VIDEO_DURATION else int(estimated / MAX_VIDEO_DURATION) + 1
+
+
+def main():
+    stories = load_corpus()
+    if not stories:
+        print("❌ No stories found")
+        return
+    print(f"🧪 Corpus: {len(stories)} stories")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "normalized_text_cache.json"
+        normalizer = TextNormalizer(cache_path)
+
+        start = time.perf_counter()
+        normalized = [normalizer.normalize_story(story) for story in stories]
+        cold = time.perf_counter() - start
+        normalizer.save()
+
+        normalizer = TextNormalizer(cache_path)  # Fresh process view: cache read back from disk
+        start = time.perf_counter()
+        for _ in range(CACHED_PASSES):
+            for story in stories:
+                normalizer.normalize_story(story)
+        cached = (time.perf_counter() - start) / CACHED_PASSES
+
+    print(f"\n📊 NORMALIZATION SAVINGS")
+    print(f"{'=' * 100}")
+    print(f"{'story':<48}{'chars':>9}{'saved':>8}{'words':>8}{'saved':>7}{'secs saved':>12}{'parts':>8}")
+    totals = {"chars": 0, "chars_saved": 0, "words": 0, "words_saved": 0, "seconds_saved": 0.0, "parts_saved": 0}
+    for story, clean in zip(stories, normalized):
+        raw_text, clean_text = narration(story), narration(clean)
+        raw_words, clean_words = len(raw_text.split()), len(clean_text.split())
+        chars_saved = len(raw_text) - len(clean_text)
+        seconds_saved = seconds(raw_text) - seconds(clean_text)
+        raw_parts, clean_parts = parts(raw_text), parts(clean_text)
+
+        totals["chars"] += len(raw_text)
+        totals["chars_saved"] += chars_saved
+        totals["words"] += raw_words
+        totals["words_saved"] += raw_words - clean_words
+        totals["seconds_saved"] += seconds_saved
+        totals["parts_saved"] += raw_parts - clean_parts
+
+        print(f"{story.get('title', '')[:46]:<48}{len(raw_text):>9,}{chars_saved:>8,}{raw_words:>8,}"
+              f"{raw_words - clean_words:>7,}{seconds_saved:>12.1f}{f'{raw_parts}->{clean_parts}':>8}")
+
+    print(f"{'-' * 100}")
+    print(f"{'TOTAL':<48}{totals['chars']:>9,}{totals['chars_saved']:>8,}{totals['words']:>8,}"
+          f"{totals['words_saved']:>7,}{totals['seconds_saved']:>12.1f}{totals['parts_saved']:>8}")
+    print(f"\n✂️ {totals['chars_saved'] / max(1, totals['chars']):.1%} of characters removed, "
+          f"~{totals['seconds_saved']:.0f}s of narration saved at {WORDS_PER_MINUTE} WPM")
+    print(f"⏱️ Normalize: {cold * 1000:.2f} ms cold, {cached * 1000:.3f} ms cached "
+          f"({len(stories)} stories)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+bench_tag_matcher.py
+
+Micro-benchmark: compiled TagMatcher vs the old `any(tag in title_lower ...)` loop.
+Runs on the titles in viral_stories_full.json padded with synthetic titles,
+for the current VIRAL_TAGS and for a tag list grown into the hundreds.
+
+Usage:
+python bench_tag_matcher.py
+"""
+
+import json
+import random
+import timeit
+from pathlib import Path
+
+from reddit_story_fetcher import VIRAL_TAGS
+from tag_matcher import TagMatcher
+
+# ===============================================
+# CONFIGURATION
+# ===============================================
+STORIES_FILE = "viral_stories_full.json"
+NUM_TITLES = 20000  # Titles per run (real titles padded with synthetic ones)
+EXTRA_TAGS = 400  # Synthetic tags added for the "large tag list" case
+REPEATS = 5
+# ===============================================
+
+WORDS = ("my", "husband", "wife", "boyfriend", "girlfriend", "sister", "mom", "wedding", "friend",
+         "refused", "told", "found", "out", "ruined", "secret", "party", "money", "house", "job",
+         "for", "the", "after", "because", "years", "cheating", "update", "aita", "tifu", "ex")
+
+
+def build_titles(count):
+    titles = []
+    path = Path(STORIES_FILE)
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            titles = [story['title'] for story in json.load(f)]
+
+    rnd = random.Random(42)
+    while len(titles) < count:
+        titles.append(" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 18))))
+    return [title.lower() for title in titles[:count]]
+
+
+def build_extra_tags(count):
+    rnd = random.Random(7)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rnd.choice(letters) for _ in range(rnd.randint(4, 10))) for _ in range(count)]
+
+
+def bench(label, titles, tags):
+    tags_lower = [tag.lower() for tag in tags]
+    matcher = TagMatcher(tags)
+
+    # Same answers as the old loop, including which tags matched
+    for title in titles:
+        assert matcher.is_match(title) == any(tag in title for tag in tags_lower)
+        assert set(matcher.matches(title)) == {tag for tag in tags_lower if tag in title}
+
+    cases = [
+        ("old any() filter", lambda: [any(tag in t for tag in tags_lower) for t in titles]),
+        ("TagMatcher.is_match", lambda: [matcher.is_match(t) for t in titles]),
+        ("old matched-tags list", lambda: [[tag for tag in tags_lower if tag in t] for t in titles]),
+        ("TagMatcher.matches", lambda: [matcher.matches(t) for t in titles]),
+    ]
+
+    print(f"\n📊 {label}: {len(matcher.tags)} tags x {len(titles)} titles")
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=REPEATS))
+        print(f"   • {name:<24} {best * 1000:8.1f} ms  ({len(titles) / best:,.0f} titles/s)")
+
+
+def main():
+    titles = build_titles(NUM_TITLES)
+    bench("Current VIRAL_TAGS", titles, VIRAL_TAGS)
+    bench("Large tag list", titles, VIRAL_TAGS + build_extra_tags(EXTRA_TAGS))
+
+
+if __name__ == "__main__":
+    main()
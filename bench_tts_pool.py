@@ -0,0 +1,126 @@
+"""
+bench_tts_pool.py
+
+Scaling benchmark for TTSPool. Uses a synthetic, CPU-bound stand-in for a
+pyttsx3 engine (same save_to_file / runAndWait / voices interface, burns CPU in
+proportion to the text and writes a WAV of the spoken length) so it runs on any
+box without a speech engine. Reports wall time, speedup and parallel efficiency
+per worker count against the in-process single-engine baseline.
+
+Usage:
+python bench_tts_pool.py
+"""
+
+import os
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+from tts_pool import TTSPool, configure_engine
+
+# ===============================================
+# CONFIGURATION
+# ===============================================
+CHUNKS = 96  # ~3 parts x 32 chunks
+WORDS_PER_CHUNK = 18
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+CPU_WORK_PER_CHAR = 4000  # Loop iterations per character: ~synthesis cost of a real engine
+RATE = 230
+VOLUME = 0.93
+SAMPLE_RATE = 22050
+# ===============================================
+
+WORDS = ("my", "husband", "refused", "to", "come", "to", "the", "wedding", "after", "she", "told",
+         "everyone", "about", "the", "money", "and", "then", "left")
+
+
+class SyntheticEngine:
+    """CPU-bound stand-in for a pyttsx3 engine"""
+
+    class Voice:
+        def __init__(self, voice_id, name):
+            self.id, self.name = voice_id, name
+
+    def __init__(self):
+        self.properties = {"voices": [self.Voice("m", "David"), self.Voice("f", "Zira")]}
+        self.queue = []
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def save_to_file(self, text, path):
+        self.queue.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self.queue:
+            acc = 0
+            for i in range(len(text) * CPU_WORK_PER_CHAR):
+                acc ^= i
+            frames = int(len(text.split()) * 60 / self.properties["rate"] * SAMPLE_RATE)
+            with wave.open(str(path), 'wb') as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(SAMPLE_RATE)
+                w.writeframes(b"\0\0" * frames)
+        self.queue = []
+
+
+def synthetic_engine():
+    return SyntheticEngine()
+
+
+def make_jobs(out_dir):
+    jobs = []
+    for i in range(CHUNKS):
+        text = " ".join(WORDS[(i + j) % len(WORDS)] for j in range(WORDS_PER_CHUNK)) + "."
+        jobs.append((text, Path(out_dir) / f"chunk_{i:03d}.wav"))
+    return jobs
+
+
+def run_in_process(jobs):
+    engine = configure_engine(synthetic_engine(), RATE, VOLUME)
+    start = time.perf_counter()
+    for text, path in jobs:
+        engine.save_to_file(text, str(path))
+    engine.runAndWait()
+    return time.perf_counter() - start
+
+
+def run_pool(jobs, workers):
+    with TTSPool(RATE, VOLUME, workers=workers, engine_factory=synthetic_engine) as pool:
+        pool.synthesize(jobs[:workers])  # Warm up: spawn workers and build their engines
+        start = time.perf_counter()
+        results = pool.synthesize(jobs)
+        elapsed = time.perf_counter() - start
+
+    # Results must come back in job order with the right durations
+    assert [path for path, _ in results] == [str(path) for _, path in jobs]
+    assert all(duration and duration > 0 for _, duration in results)
+    return elapsed
+
+
+def main():
+    print(f"🧪 {CHUNKS} chunks x {WORDS_PER_CHUNK} words, {os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = make_jobs(tmp)
+        baseline = run_in_process(jobs)
+
+        print(f"\n📊 TTS POOL SCALING")
+        print(f"{'=' * 60}")
+        print(f"{'run':<24}{'wall s':>9}{'chunks/s':>10}{'speedup':>9}{'efficiency':>12}")
+        print(f"{'in-process engine':<24}{baseline:>9.2f}{CHUNKS / baseline:>10.1f}{1.0:>9.2f}{'':>12}")
+        for workers in WORKER_COUNTS:
+            if workers > (os.cpu_count() or 1):
+                continue
+            elapsed = run_pool(jobs, workers)
+            speedup = baseline / elapsed
+            print(f"{f'pool, {workers} workers':<24}{elapsed:>9.2f}{CHUNKS / elapsed:>10.1f}"
+                  f"{speedup:>9.2f}{speedup / workers:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+
+# --- Caption renderer configuration ---
+CAPTION_CACHE_SIZE = 1024  # Rendered captions kept in memory (part indicators repeat every part)
+FONT_SUFFIXES = (".ttf", ".otf", ".ttc")
+FALLBACK_FONTS = ("DejaVuSans-Bold", "Arial Bold", "Arial")
+
+
+def font_dirs():
+    dirs = [Path("fonts"), Path.home() / ".fonts", Path.home() / ".local/share/fonts",
+            Path("/usr/share/fonts"), Path("/usr/local/share/fonts"),
+            Path("/Library/Fonts"), Path.home() / "Library/Fonts"]
+    if os.name == "nt":
+        dirs.insert(1, Path(os.environ.get("WINDIR", r"C:\Windows")) / "Fonts")
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            dirs.insert(2, Path(local) / "Microsoft/Windows/Fonts")
+    return [d for d in dirs if d.is_dir()]
+
+
+def _squash(name):
+    return name.lower().replace(" ", "").replace("-", "").replace("_", "")
+
+
+@lru_cache(maxsize=None)
+def find_font_file(name):
+    """Font file for a family name like "Anton" (or a path) - searched once per name"""
+    if Path(name).suffix.lower() in FONT_SUFFIXES and Path(name).exists():
+        return str(Path(name))
+
+    wanted = _squash(name)
+    matches = []
+    for directory in font_dirs():
+        for path in directory.rglob("*"):
+            if path.suffix.lower() in FONT_SUFFIXES and _squash(path.stem).startswith(wanted):
+                matches.append(path)
+    if not matches:
+        return None
+    # Prefer the plain / regular face: "Anton-Regular" over "AntonSC-Bold"
+    matches.sort(key=lambda p: (len(_squash(p.stem)) - len(wanted), "regular" not in p.stem.lower()))
+    return str(matches[0])
+
+
+@lru_cache(maxsize=None)
+def load_font(name, size):
+    """Cached Pillow font object per (name, size)"""
+    from PIL import ImageFont
+
+    path = find_font_file(name)
+    if path is None:
+        for fallback in FALLBACK_FONTS:
+            path = find_font_file(fallback)
+            if path:
+                print(f"⚠️ Font '{name}' not found, using {Path(path).name}")
+                break
+    if path is None:
+        print(f"⚠️ Font '{name}' not found, using Pillow's default font")
+        return ImageFont.load_default(size)
+    return ImageFont.truetype(path, size)
+
+
+def wrap_to_width(line, font, max_width):
+    """Greedy word wrap by rendered width (ImageMagick caption wraps lines that don't fit)"""
+    words = line.split()
+    if not words:
+        return [""]
+    lines, current = [], words[0]
+    for word in words[1:]:
+        candidate = f"{current} {word}"
+        if font.getlength(candidate) <= max_width:
+            current = candidate
+        else:
+            lines.append(current)
+            current = word
+    lines.append(current)
+    return lines
+
+
+@lru_cache(maxsize=CAPTION_CACHE_SIZE)
+def render_caption(text, font, fontsize, color, stroke_color, stroke_width, width):
+    """Stroked, wrapped, centered caption as an RGBA uint8 array (height, width, 4)
+
+    Same layout as TextClip(method='caption', align='center', size=(width, None)):
+    the block is `width` wide, lines are centered, height fits the text.
+    Memoized on every argument, so a repeated caption is rendered once.
+    """
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    pil_font = load_font(font, fontsize)
+    ascent, descent = pil_font.getmetrics()
+    line_height = ascent + descent
+
+    lines = []
+    for line in text.split("\n"):
+        lines.extend(wrap_to_width(line, pil_font, width - 2 * stroke_width))
+
+    height = line_height * len(lines) + 2 * stroke_width
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((width / 2, stroke_width + i * line_height), line, font=pil_font, fill=color,
+                  anchor="ma", stroke_width=stroke_width, stroke_fill=stroke_color)
+
+    array = np.asarray(image)
+    array.setflags(write=False)  # Shared between every clip that shows this caption
+    return array
+
+
+def caption_clip(rgba):
+    """moviepy ImageClip over a rendered caption (alpha channel becomes the mask)"""
+    from moviepy.editor import ImageClip
+    return ImageClip(rgba, transparent=True)
@@ -0,0 +1,173 @@
+import hashlib
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+
+from karaoke_captions import blit
+from runtime_tools import get_tool_path
+
+# --- ffmpeg render backend: the whole part in one ffmpeg process ---
+VIDEO_WIDTH = 1080
+VIDEO_HEIGHT = 1920
+FPS = 30
+VIDEO_BITRATE = "8000k"
+X264_PRESET = "medium"  # moviepy's write_videofile default
+
+
+def caption_png(rgba, folder):
+    """Write a rendered caption once per distinct image - repeated captions share one PNG"""
+    from PIL import Image
+
+    digest = hashlib.sha1(rgba.tobytes())
+    digest.update(str(rgba.shape).encode())
+    path = Path(folder) / f"caption_{digest.hexdigest()[:16]}.png"
+    if not path.exists():
+        Image.fromarray(rgba, "RGBA").save(path, compress_level=1)
+    return path
+
+
+def caption_track(layers, folder, name="captions"):
+    """Flatten timed, positioned caption images into one concat-demuxer input for a single overlay
+
+    layers: [{"rgba": array, "x": px, "y": px, "start": s, "end": s}, ...]. Every
+    interval between two layer start / end times becomes one frame: the layers
+    active in it composited onto a transparent canvas over their joint bounding
+    box. Karaoke flattens a part's blocks + word highlights this way, so it costs
+    one input and one overlay however many words the part has. Frames are
+    RLE TGA - several times faster to write than PNG at a similar size.
+    Returns a caption entry for build_filtergraph / build_command:
+    {"track", "images", "x", "y", "start", "end"}.
+    """
+    import numpy as np
+    from PIL import Image
+
+    left = min(layer["x"] for layer in layers)
+    top = min(layer["y"] for layer in layers)
+    width = max(layer["x"] + layer["rgba"].shape[1] for layer in layers) - left
+    height = max(layer["y"] + layer["rgba"].shape[0] for layer in layers) - top
+    blank = np.zeros((height, width, 4), dtype=np.uint8)
+
+    def write(canvas):
+        path = Path(folder) / f"{name}_{len(images):04d}.tga"
+        Image.fromarray(canvas, "RGBA").save(path, compression="tga_rle")
+        images.append(path)
+        return path
+
+    images = []
+    blank_frame = write(blank)
+    times = sorted({t for layer in layers for t in (layer["start"], layer["end"])})
+    ordered = sorted(range(len(layers)), key=lambda i: layers[i]["start"])
+    frames, active, previous, position = [[blank_frame, times[0]]], [], (), 0
+    for begin, end in zip(times, times[1:]):
+        # Sweep: layers enter in start order and leave once they end (stacking order is list order)
+        while position < len(ordered) and layers[ordered[position]]["start"] <= begin:
+            active.append(ordered[position])
+            position += 1
+        active = [i for i in active if layers[i]["end"] > begin]
+        visible = tuple(sorted(active))
+        if visible == previous:
+            frames[-1][1] += end - begin
+            continue
+        canvas = blank.copy()
+        for n, i in enumerate(visible):
+            layer = layers[i]
+            x, y = layer["x"] - left, layer["y"] - top
+            if n == 0:  # Over a transparent canvas the bottom layer is just copied
+                canvas[y:y + layer["rgba"].shape[0], x:x + layer["rgba"].shape[1]] = layer["rgba"]
+            else:
+                blit(canvas, layer["rgba"], x, y)
+        frames.append([write(canvas) if visible else blank_frame, end - begin])
+        previous = visible
+
+    # Entries are bare file names, resolved next to the list file
+    lines = ["ffconcat version 1.0"]
+    for image, duration in frames:
+        lines += [f"file {image.name}", f"duration {duration:.3f}"]
+    lines.append(f"file {blank_frame.name}")  # The last entry's duration only counts if a file follows
+    track = Path(folder) / f"{name}.ffconcat"
+    track.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return {"track": track, "images": images, "x": left, "y": top, "start": times[0], "end": times[-1]}
+
+
+@lru_cache(maxsize=None)
+def has_filter(name):
+    """Whether the ffmpeg build has a filter (e.g. 'subtitles' needs libass)"""
+    ffmpeg = get_tool_path("ffmpeg")
+    if not ffmpeg:
+        return False
+    result = subprocess.run([ffmpeg, "-hide_banner", "-filters"], capture_output=True, text=True)
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+
+def filter_path(path):
+    """A path as a quoted filter option value (drive colons and backslashes escaped)"""
+    value = Path(path).resolve().as_posix().replace("\\", "\\\\").replace(":", "\\:")
+    return f"'{value}'"
+
+
+def build_filtergraph(captions, width=VIDEO_WIDTH, height=VIDEO_HEIGHT, fps=FPS, subtitles=None, fonts_dir=None):
+    """Background scale/crop plus one timed overlay per caption, chained into [v]
+
+    captions: [{"image": png path, "start": s, "end": s}, ...] - input i + 1 is
+    caption i (input 0 is the background). Captions are centered unless they
+    carry a pixel "x" / "y" (karaoke word highlights). A single-frame image input repeats
+    its last frame, so `enable` alone decides when each caption is visible (a
+    caption_track entry holds its blank last frame, so the same applies).
+    subtitles: an ASS file burned in by libass on the background chain instead.
+    """
+    background = (f"[0:v]scale={width}:{height}:force_original_aspect_ratio=increase,"
+                  f"crop={width}:{height},setsar=1,fps={fps}")
+    if subtitles:
+        background += f",subtitles=filename={filter_path(subtitles)}"
+        if fonts_dir:
+            background += f":fontsdir={filter_path(fonts_dir)}"
+    graph = [f"{background}[bg]"]
+    last = "bg"
+    for i, caption in enumerate(captions, 1):
+        label = f"v{i}"
+        x, y = caption.get("x", "(W-w)/2"), caption.get("y", "(H-h)/2")
+        graph.append(f"[{last}][{i}:v]overlay=x={x}:y={y}:"
+                     f"enable='between(t,{caption['start']:.3f},{caption['end']:.3f})'[{label}]")
+        last = label
+    graph.append(f"[{last}]format=yuv420p[v]")
+    return ";\n".join(graph)
+
+
+def build_command(ffmpeg, background, captions, audio_path, duration, output_path, script_path):
+    command = [ffmpeg, "-y", "-hide_banner", "-loglevel", "error",
+               "-stream_loop", "-1", "-i", str(background)]  # Loop the background to cover the narration
+    for caption in captions:
+        if "track" in caption:
+            command += ["-f", "concat", "-i", str(caption["track"])]
+        else:
+            command += ["-i", str(caption["image"])]
+    command += ["-i", str(audio_path),
+                "-filter_complex_script", str(script_path),
+                "-map", "[v]", "-map", f"{len(captions) + 1}:a",
+                "-t", f"{duration:.3f}", "-r", str(FPS),
+                "-c:v", "libx264", "-preset", X264_PRESET, "-b:v", VIDEO_BITRATE,
+                "-c:a", "aac", str(output_path)]
+    return command
+
+
+def render_part(background, captions, audio_path, duration, output_path, work_dir, subtitles=None, fonts_dir=None):
+    """Encode background + timed caption images (or burned-in subtitles) + narration in one ffmpeg invocation
+
+    All decoding, scaling, overlaying and encoding runs inside ffmpeg's own
+    threads. The filtergraph goes through a script file so long parts don't hit
+    command line length limits.
+    """
+    ffmpeg = get_tool_path("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg not found - install it or use the moviepy render backend")
+
+    script_path = Path(work_dir) / f"{Path(output_path).stem}.filtergraph.txt"
+    script_path.write_text(build_filtergraph(captions, subtitles=subtitles, fonts_dir=fonts_dir), encoding='utf-8')
+    try:
+        command = build_command(ffmpeg, background, captions, audio_path, duration, output_path, script_path)
+        result = subprocess.run(command, capture_output=True, text=True)
+    finally:
+        script_path.unlink(missing_ok=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({result.returncode}): {result.stderr.strip()[-500:]}")
+    return str(output_path)
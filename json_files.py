@@ -0,0 +1,32 @@
+import json
+import os
+from pathlib import Path
+
+
+# --- Small JSON state files (indexes, caches, configs) shared across runs ---
+def load_json(path, default, description=None):
+    """Parsed JSON file, or `default` when it is missing, unreadable or not the expected type
+
+    An unreadable file is reported and treated as empty, so a corrupt cache or
+    index only costs a rebuild, never a crash.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        print(f"⚠️ Could not read {description or path}, starting fresh: {e}")
+        return default
+    if default is not None and not isinstance(data, type(default)):
+        print(f"⚠️ Unexpected contents in {description or path}, starting fresh")
+        return default
+    return data
+
+
+def atomic_write_json(path, data, **dump_options):
+    """Write to <path>.tmp and rename it over `path` - a crash never leaves a half-written file"""
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_options)
+    os.replace(tmp_path, path)
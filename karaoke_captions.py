@@ -0,0 +1,152 @@
+import math
+import textwrap
+
+from caption_renderer import load_font, wrap_to_width
+from speech_model import speech_features
+
+# --- Karaoke captions: the chunk block with the spoken word highlighted ---
+MINOR_PAUSE_CHARS = 3  # Uncalibrated word weights: a comma costs about as much as 3 characters
+MAJOR_PAUSE_CHARS = 6
+MIN_WORD_SHARE = 0.25  # No word is highlighted for less than 1/4 of an average word
+
+
+def word_weights(words, coefficients=None):
+    """Relative speaking time per word
+
+    With a calibrated speech model the fitted per-character, per-word and pause
+    coefficients are used (the intercept is per utterance, not per word);
+    otherwise characters, with pauses counted as extra characters.
+    """
+    weights = []
+    for word in words:
+        _, chars, count, minor, major = speech_features(word)
+        if coefficients:
+            weight = sum(c * x for c, x in zip(coefficients[1:], (chars, count, minor, major)))
+        else:
+            weight = chars + MINOR_PAUSE_CHARS * minor + MAJOR_PAUSE_CHARS * major
+        weights.append(weight)
+    floor = MIN_WORD_SHARE * sum(max(w, 0.0) for w in weights) / len(weights) if weights else 0.0
+    return [max(w, floor, 1e-6) for w in weights]
+
+
+def word_timings(text, start, duration, coefficients=None):
+    """[(word, start, duration), ...] tiling the chunk's span in proportion to word weights"""
+    words = text.split()
+    if not words:
+        return []
+    weights = word_weights(words, coefficients)
+    total = sum(weights)
+    timings, position = [], start
+    for word, weight in zip(words, weights):
+        length = duration * weight / total
+        timings.append((word, position, length))
+        position += length
+    return timings
+
+
+def karaoke_wrap(text, chars_per_line):
+    """textwrap.fill that never splits a word, so the laid-out words are exactly text.split()"""
+    return textwrap.fill(text, width=chars_per_line, break_long_words=False, break_on_hyphens=False)
+
+
+def blit(dst, src, x, y):
+    """Alpha-composite an RGBA sprite onto an RGBA block in place (clipped to the block)"""
+    import numpy as np
+
+    height, width = dst.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + src.shape[1], width), min(y + src.shape[0], height)
+    if x0 >= x1 or y0 >= y1:
+        return
+    top = src[y0 - y:y1 - y, x0 - x:x1 - x].astype(np.float32) / 255.0
+    bottom = dst[y0:y1, x0:x1].astype(np.float32) / 255.0
+    alpha = top[..., 3:] + bottom[..., 3:] * (1.0 - top[..., 3:])
+    rgb = (top[..., :3] * top[..., 3:] + bottom[..., :3] * bottom[..., 3:] * (1.0 - top[..., 3:])) \
+        / np.maximum(alpha, 1e-6)
+    dst[y0:y1, x0:x1] = np.round(np.concatenate([rgb, alpha], axis=-1) * 255.0).astype(np.uint8)
+
+
+class WordAtlas:
+    """Every word rasterized once per color - caption blocks and highlights are built from these sprites"""
+
+    def __init__(self, font, fontsize, stroke_color, stroke_width):
+        self.font = font
+        self.fontsize = fontsize
+        self.stroke_color = stroke_color
+        self.stroke_width = stroke_width
+        self.sprites = {}
+        self.blocks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def sprite(self, word, color):
+        """RGBA sprite of one word: the glyphs plus stroke_width padding on every side"""
+        key = (word, color)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            return sprite
+        self.misses += 1
+
+        import numpy as np
+        from PIL import Image, ImageDraw
+
+        pil_font = load_font(self.font, self.fontsize)
+        ascent, descent = pil_font.getmetrics()
+        pad = self.stroke_width
+        image = Image.new("RGBA", (math.ceil(pil_font.getlength(word)) + 2 * pad, ascent + descent + 2 * pad),
+                          (0, 0, 0, 0))
+        ImageDraw.Draw(image).text((pad, pad), word, font=pil_font, fill=color, anchor="la",
+                                   stroke_width=pad, stroke_fill=self.stroke_color)
+        sprite = np.asarray(image)
+        sprite.setflags(write=False)
+        self.sprites[key] = sprite
+        return sprite
+
+    def layout(self, text, width):
+        """Sprite positions [(word, x, y), ...] in reading order and the block height
+
+        Same lines and centering as render_caption, so a block assembled from
+        sprites lines up with the chunk captions.
+        """
+        pil_font = load_font(self.font, self.fontsize)
+        ascent, descent = pil_font.getmetrics()
+        line_height = ascent + descent
+
+        lines = []
+        for line in text.split("\n"):
+            lines.extend(wrap_to_width(line, pil_font, width - 2 * self.stroke_width))
+
+        positions = []
+        for i, line in enumerate(lines):
+            left = width / 2 - pil_font.getlength(line) / 2
+            words = line.split()
+            for j, word in enumerate(words):
+                prefix = " ".join(words[:j]) + " " if j else ""
+                positions.append((word, round(left + pil_font.getlength(prefix)), i * line_height))
+        return positions, line_height * len(lines) + 2 * self.stroke_width
+
+    def karaoke(self, text, width, color, highlight_color):
+        """(base block RGBA, [(highlight sprite, x, y), ...] one per word of text.split())
+
+        The base block is assembled once per (text, color); each highlight is a
+        word-sized sprite, so only that region of a frame changes while it's spoken.
+        """
+        import numpy as np
+
+        positions, height = self.layout(text, width)
+        key = (text, width, color)
+        block = self.blocks.get(key)
+        if block is None:
+            block = np.zeros((height, width, 4), dtype=np.uint8)
+            for word, x, y in positions:
+                blit(block, self.sprite(word, color), x - self.stroke_width, y)
+            block.setflags(write=False)
+            self.blocks[key] = block
+
+        highlights = [(self.sprite(word, highlight_color), x - self.stroke_width, y) for word, x, y in positions]
+        return block, highlights
+
+    def report(self):
+        print(f"🔤 Word atlas: {len(self.sprites)} sprites, {len(self.blocks)} blocks, "
+              f"{self.hits} hits / {self.misses} rasterized")
@@ -0,0 +1,130 @@
+import re
+import threading
+import zlib
+
+# --- MinHash / LSH configuration ---
+SHINGLE_WORDS = 5  # Words per shingle
+NUM_PERM = 64  # MinHash signature length
+LSH_BANDS = 16  # 16 bands x 4 rows: stories ~50%+ similar become candidates
+NEAR_DUPLICATE_THRESHOLD = 0.8  # Estimated Jaccard similarity that counts as a duplicate
+MINHASH_SCHEME = 1  # Stored next to each signature - bump when shingling or hashing changes
+
+_PRIME = 4294967311  # Smallest prime above 2**32 (crc32 range)
+_MIX_A, _MIX_B = 2654435761, 97531  # Fixed mixing constants: signatures must stay comparable across runs
+_EMPTY_BIN_STEP = 1 << 27  # Offset per bin borrowed from when densifying empty bins
+
+# A word is any run that isn't whitespace or punctuation, so Devanagari keeps its vowel signs (\w splits at them)
+_WORD_RE = re.compile(r"[^\s!-&(-/:-@\[-`{-~\u0964\u0965\u2000-\u206f\u3000-\u303f]+")
+
+
+def shingle_hashes(text):
+    """crc32 of every SHINGLE_WORDS-word window of the normalized text"""
+    words = _WORD_RE.findall(text.casefold())
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode('utf-8'))
+            for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash_signature(text):
+    """NUM_PERM-long MinHash signature, stored on each story as 'minhash'
+
+    One-permutation hashing: every shingle is hashed once and lands in one of
+    NUM_PERM bins, keeping the minimum per bin - one pass instead of NUM_PERM.
+    Empty bins borrow from the next filled bin (densification) so short texts
+    still produce comparable signatures. Text without a single word gets None:
+    it has nothing to compare, so it is never anyone's duplicate.
+    """
+    hashes = shingle_hashes(text)
+    if not hashes:
+        return None
+
+    bins = [None] * NUM_PERM
+    for h in hashes:
+        x = (_MIX_A * h + _MIX_B) % _PRIME
+        slot, value = x % NUM_PERM, x // NUM_PERM
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+
+    signature = []
+    for i in range(NUM_PERM):
+        distance = 0
+        while bins[(i + distance) % NUM_PERM] is None:
+            distance += 1
+        signature.append(bins[(i + distance) % NUM_PERM] + distance * _EMPTY_BIN_STEP)
+    return signature
+
+
+def story_signature(story):
+    """Stored signature of a story, recomputed when missing or made by another MINHASH_SCHEME"""
+    if 'minhash' in story and story.get('minhash_scheme') == MINHASH_SCHEME:
+        return story['minhash']
+    return minhash_signature(story.get('full_story', ''))
+
+
+def estimate_similarity(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+# --- LSH index: lookups touch LSH_BANDS buckets, not the whole corpus ---
+class MinHashLSH:
+    """Banded LSH over MinHash signatures for sub-linear near-duplicate lookups"""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature):
+        return [tuple(signature[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+
+    def _best_match(self, signature, band_keys, exclude=None):
+        candidates = set()
+        for bucket, band_key in zip(self.buckets, band_keys):
+            candidates.update(bucket.get(band_key, ()))
+        candidates.discard(exclude)
+
+        best_key, best_sim = None, 0.0
+        for key in candidates:
+            sim = estimate_similarity(signature, self.signatures[key])
+            if sim > best_sim:
+                best_key, best_sim = key, sim
+        if best_sim >= self.threshold:
+            return best_key, best_sim
+        return None, best_sim
+
+    def _insert(self, key, signature, band_keys):
+        self.signatures[key] = signature
+        for bucket, band_key in zip(self.buckets, band_keys):
+            bucket.setdefault(band_key, []).append(key)
+
+    def insert(self, key, signature):
+        if signature is None:
+            return
+        with self._lock:
+            if key not in self.signatures:
+                self._insert(key, signature, self._band_keys(signature))
+
+    def query(self, signature):
+        """Most similar stored key above the threshold -> (key, similarity), else (None, best)"""
+        if signature is None:
+            return None, 0.0
+        with self._lock:
+            return self._best_match(signature, self._band_keys(signature))
+
+    def check_and_insert(self, key, signature):
+        """Atomic query + insert so two fetch threads can't both admit the same story"""
+        if signature is None:
+            return None, 0.0
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            duplicate_of, similarity = self._best_match(signature, band_keys, exclude=key)
+            if key not in self.signatures:
+                self._insert(key, signature, band_keys)
+            return duplicate_of, similarity
+
+    def __len__(self):
+        return len(self.signatures)
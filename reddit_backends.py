@@ -0,0 +1,189 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+# Submission fields the fetcher reads - all a snapshot needs to keep
+SUBMISSION_FIELDS = ("id", "title", "selftext", "author", "score", "num_comments",
+                     "url", "permalink", "created_utc")
+
+
+# --- Snapshot helpers ---
+class SnapshotSubmission:
+    """Plain stand-in for a praw Submission, rebuilt from a recorded dict"""
+
+    def __init__(self, data):
+        for field in SUBMISSION_FIELDS:
+            setattr(self, field, data.get(field))
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in SUBMISSION_FIELDS}
+
+
+def submission_to_dict(submission):
+    data = {field: getattr(submission, field, None) for field in SUBMISSION_FIELDS}
+    data["author"] = str(submission.author) if getattr(submission, 'author', None) else None
+    return data
+
+
+def _safe_name(text):
+    return re.sub(r'[^\w\-]+', '_', text).strip('_')
+
+
+def listing_file(snapshot_dir, sub, sort, timeframe):
+    return Path(snapshot_dir) / "listings" / f"{_safe_name(sub)}__{sort}__{timeframe}.json"
+
+
+def search_file(snapshot_dir, sub, query, sort, timeframe):
+    digest = hashlib.sha1(query.encode('utf-8')).hexdigest()[:12]
+    return Path(snapshot_dir) / "searches" / f"{_safe_name(sub)}__{sort}__{timeframe}__{digest}.json"
+
+
+def comments_file(snapshot_dir, permalink):
+    return Path(snapshot_dir) / "comments" / f"{_safe_name(permalink)}.json"
+
+
+def write_snapshot(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+# --- Live backend ---
+class PrawBackend:
+    """Live Reddit API through praw (one client per worker thread)"""
+    name = "praw (live)"
+
+    def __init__(self, client_id, client_secret, user_agent):
+        self.credentials = {"client_id": client_id, "client_secret": client_secret, "user_agent": user_agent}
+        self._local = threading.local()
+        self._reddit_client()  # Fail early on bad credentials / missing praw
+
+    def _reddit_client(self):
+        """praw.Reddit is not thread safe - every worker thread gets its own client"""
+        client = getattr(self._local, 'reddit', None)
+        if client is None:
+            import praw
+            client = self._local.reddit = praw.Reddit(**self.credentials)
+        return client
+
+    def listing(self, sub, sort, timeframe, limit):
+        subreddit_obj = self._reddit_client().subreddit(sub)
+        if sort == "hot":
+            submissions = subreddit_obj.hot(limit=limit)
+        elif sort == "new":
+            submissions = subreddit_obj.new(limit=limit)
+        else:
+            submissions = subreddit_obj.top(time_filter=timeframe, limit=limit)
+        # Listings are lazy - materialize so every page is fetched here
+        return list(submissions)
+
+    def search(self, sub, query, sort, timeframe, limit):
+        search_sort = sort if sort in ("relevance", "hot", "top", "new", "comments") else "top"
+        results = self._reddit_client().subreddit(sub).search(
+            query, sort=search_sort, syntax="lucene", time_filter=timeframe, limit=limit)
+        return list(results)
+
+    def top_comments(self, permalink, limit):
+        submission = self._reddit_client().submission(url=f"https://www.reddit.com{permalink}")
+        submission.comments.replace_more(limit=0)
+        return [{
+            "author": str(comment.author) if comment.author else "[deleted]",
+            "score": comment.score,
+            "body": comment.body
+        } for comment in submission.comments[:limit]]
+
+
+# --- Recorder: passes through to another backend and snapshots everything ---
+class RecordingBackend:
+    """Wraps a backend and saves every listing / comment response to snapshot_dir"""
+
+    def __init__(self, inner, snapshot_dir="reddit_snapshots"):
+        self.inner = inner
+        self.snapshot_dir = Path(snapshot_dir)
+        self.name = f"recording {inner.name} -> {self.snapshot_dir}"
+
+    def listing(self, sub, sort, timeframe, limit):
+        records = [submission_to_dict(s) for s in self.inner.listing(sub, sort, timeframe, limit)]
+        path = listing_file(self.snapshot_dir, sub, sort, timeframe)
+
+        # Keep the deepest recording so replays can serve any smaller limit
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                if len(json.load(f)) > len(records):
+                    return [SnapshotSubmission(r) for r in records]
+        write_snapshot(path, records)
+        return [SnapshotSubmission(r) for r in records]
+
+    def search(self, sub, query, sort, timeframe, limit):
+        records = [submission_to_dict(s) for s in self.inner.search(sub, query, sort, timeframe, limit)]
+        write_snapshot(search_file(self.snapshot_dir, sub, query, sort, timeframe), records)
+        return [SnapshotSubmission(r) for r in records]
+
+    def top_comments(self, permalink, limit):
+        comments = self.inner.top_comments(permalink, limit)
+        write_snapshot(comments_file(self.snapshot_dir, permalink), comments)
+        return comments
+
+
+# --- Replay: serves recorded snapshots with optional fake network latency ---
+class ReplayBackend:
+    """Offline backend that feeds recorded snapshots back through the fetcher"""
+
+    def __init__(self, snapshot_dir="reddit_snapshots", latency=0.0):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.latency = latency  # Seconds slept per request to mimic the network
+        self.name = f"replay {self.snapshot_dir} ({latency * 1000:.0f} ms latency)"
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _load(self, path):
+        with self._lock:
+            if path not in self._cache:
+                if path.exists():
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self._cache[path] = json.load(f)
+                else:
+                    self._cache[path] = None
+            return self._cache[path]
+
+    def listing(self, sub, sort, timeframe, limit):
+        if self.latency:
+            # Reddit serves listings 100 items per request
+            time.sleep(self.latency * max(1, -(-limit // 100)))
+        records = self._load(listing_file(self.snapshot_dir, sub, sort, timeframe))
+        if records is None:
+            raise FileNotFoundError(f"No snapshot for r/{sub} ({sort}/{timeframe})")
+        return [SnapshotSubmission(r) for r in records[:limit]]
+
+    def search(self, sub, query, sort, timeframe, limit):
+        """Recorded search results, else a local stand-in evaluated over the listing snapshot"""
+        if self.latency:
+            time.sleep(self.latency * max(1, -(-limit // 100)))
+        records = self._load(search_file(self.snapshot_dir, sub, query, sort, timeframe))
+        if records is None:
+            listing = self._load(listing_file(self.snapshot_dir, sub, sort, timeframe))
+            if listing is None:
+                raise FileNotFoundError(f"No snapshot for r/{sub} ({sort}/{timeframe})")
+            matcher = _stand_in_query(query)
+            records = [r for r in listing if matcher.search((r.get("title") or "").lower())]
+        return [SnapshotSubmission(r) for r in records[:limit]]
+
+    def top_comments(self, permalink, limit):
+        if self.latency:
+            time.sleep(self.latency)
+        comments = self._load(comments_file(self.snapshot_dir, permalink))
+        if comments is None:
+            raise FileNotFoundError(f"No comment snapshot for {permalink}")
+        return comments[:limit]
+
+
+_TITLE_TERM_RE = re.compile(r'title:"([^"]+)"')
+
+
+def _stand_in_query(query):
+    """Approximate Reddit's title search: whole-word match on any OR'ed title:"..." term"""
+    terms = _TITLE_TERM_RE.findall(query.lower())
+    return re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\b")
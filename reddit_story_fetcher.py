@@ -1,7 +1,17 @@
-import praw
 import yaml
 import json
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from tag_matcher import get_tag_matcher, build_search_queries, QUESTION_PREFIX
+from reddit_backends import PrawBackend
+from story_store import open_story_sink, load_stories_file, convert_jsonl_to_yaml, SqliteStoryStore
+from near_duplicates import MinHashLSH, minhash_signature, story_signature, MINHASH_SCHEME
+from subreddit_scheduler import SubredditScheduler
+from json_files import load_json, atomic_write_json
 
 # --- Your Reddit App Credentials (Replace USERNAME below) ---
 CLIENT_ID = "IiQsPLXbq1koYijL7dtX8w"
@@ -61,120 +71,315 @@ SUBREDDITS = [
     "DesiConfessions"
 ]
 
+# --- Concurrency & rate limit configuration ---
+MAX_IN_FLIGHT_REQUESTS = 8  # Max subreddit requests running at the same time
+REQUESTS_PER_MINUTE = 90  # Reddit allows 100 QPM per OAuth client, keep some headroom
+LISTING_PAGE_SIZE = 100  # Reddit returns at most 100 items per listing request
+FETCH_MODE = "listing"  # "listing" = top/hot/new + client-side tag filter, "search" = tag search queries
+
+# --- Incremental fetch configuration ---
+STORIES_FILE = "viral_stories_full.jsonl"  # Append-only, one story per line (or a .db for SQLite + FTS)
+LEGACY_YAML_FILE = "viral_stories_full.yaml"  # Imported once if the JSONL file doesn't exist yet
+EXPORT_YAML = False  # Also export the corpus as YAML after each run (slow on big corpora)
+
+# --- Near-duplicate detection (BoRU reposts, crossposts, UPDATE threads) ---
+DROP_NEAR_DUPLICATES = False  # False = keep them flagged with 'duplicate_of', True = never save them
+SEEN_INDEX_FILE = "seen_posts_index.json"  # Already-fetched submissions, keyed by permalink
+
 
 # --- Helper: Filter out questions ---
 def is_story_post(title):
-    question_words = (
-        "what", "do you", "does", "did", "how", "why", "have you", "has anyone",
-        "can you", "is", "are", "who", "when", "where", "will", "should", "could"
-    )
-
     title_lower = title.strip().lower()
     if title_lower.endswith('?'):
         return False
-    if any(title_lower.startswith(qw) for qw in question_words):
+    if QUESTION_PREFIX.match(title_lower):
         return False
     return True
 
 
+# --- Global request budget shared by all fetch workers ---
+class RequestBudget:
+    """Thread-safe rate limiter: spaces requests evenly and caps requests in flight"""
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, max_in_flight=MAX_IN_FLIGHT_REQUESTS):
+        self.interval = 60.0 / requests_per_minute
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.requests_made = 0
+
+    @contextmanager
+    def request(self, count=1):
+        """Reserve `count` request slots, waiting until the budget allows them"""
+        with self._in_flight:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_slot)
+                self._next_slot = start + self.interval * count
+                self.requests_made += count
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+# --- Persistent index of already-fetched submissions ---
+class SeenPostIndex:
+    """On-disk record of fetched posts so reruns only pull new stories"""
+
+    def __init__(self, path=SEEN_INDEX_FILE):
+        self.path = Path(path)
+        self.posts = {}
+        self._lock = threading.Lock()
+        self.refreshed = 0
+        self.added = 0
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        self.posts = load_json(self.path, {}, "seen-post index").get("posts", {})
+        print(f"📇 Seen-post index: {len(self.posts)} known posts")
+
+    def save(self):
+        with self._lock:
+            atomic_write_json(self.path, {"posts": self.posts}, ensure_ascii=False)
+        print(f"📇 Seen-post index saved: {len(self.posts)} posts "
+              f"({self.added} new, {self.refreshed} refreshed this run)")
+
+    def sync_with(self, stories):
+        """Match the index to the story corpus actually on disk"""
+        permalinks = {story['permalink'] for story in stories if story.get('permalink')}
+        with self._lock:
+            dropped = [p for p in self.posts if p not in permalinks]
+            for permalink in dropped:
+                del self.posts[permalink]
+        for story in stories:
+            if story.get('permalink') and story['permalink'] not in self.posts:
+                self.add(story, count=False)
+        if dropped:
+            print(f"📇 Dropped {len(dropped)} index entries missing from the story file")
+
+    def is_known(self, permalink):
+        return permalink in self.posts
+
+    def add(self, story, count=True):
+        now = time.time()
+        with self._lock:
+            self.posts[story['permalink']] = {
+                "score": story.get('score', 0),
+                "num_comments": story.get('num_comments', 0),
+                "subreddit": story.get('subreddit'),
+                "first_seen": now,
+                "last_seen": now
+            }
+            if count:
+                self.added += 1
+
+    def refresh(self, permalink, score, num_comments):
+        with self._lock:
+            entry = self.posts[permalink]
+            entry["score"] = score
+            entry["num_comments"] = num_comments
+            entry["last_seen"] = time.time()
+            self.refreshed += 1
+
+    def apply_scores(self, stories):
+        """Copy refreshed scores onto stored stories, returns the stories that changed"""
+        changed = []
+        for story in stories:
+            entry = self.posts.get(story.get('permalink'))
+            if not entry:
+                continue
+            if story.get('score') != entry["score"] or story.get('num_comments') != entry["num_comments"]:
+                story['score'] = entry["score"]
+                story['num_comments'] = entry["num_comments"]
+                changed.append(story)
+        return changed
+
+
 # --- Enhanced Class for fetching and saving stories ---
 class EnhancedRedditStoryFetcher:
-    def __init__(self):
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT_REQUESTS, requests_per_minute=REQUESTS_PER_MINUTE,
+                 seen_index=None, backend=None, story_sink=None, duplicate_index=None,
+                 scheduler=None, fetch_mode=FETCH_MODE):
+        self.max_in_flight = max(1, max_in_flight)
+        self.seen_index = seen_index
+        self.story_sink = story_sink  # Accepted stories are streamed here as they pass the filters
+        self.duplicate_index = duplicate_index  # MinHashLSH over the corpus, seeded by the caller
+        self.scheduler = scheduler  # Plans listing depth per subreddit from historical yield
+        self.fetch_mode = fetch_mode
+        self.request_budget = RequestBudget(requests_per_minute, self.max_in_flight)
+        self._executor = None
+        self._stats_lock = threading.Lock()
+        self.verbose = True
+        self.reset_stats()
+
         try:
-            self.reddit = praw.Reddit(
-                client_id=CLIENT_ID,
-                client_secret=CLIENT_SECRET,
-                user_agent=USER_AGENT
-            )
-            print("✅ Connected to Reddit API")
+            # Default is the live API; record/replay backends live in reddit_backends.py
+            self.backend = backend or PrawBackend(CLIENT_ID, CLIENT_SECRET, USER_AGENT)
+            print(f"✅ Connected to Reddit backend: {self.backend.name}")
             print(f"📊 Configured to search {len(SUBREDDITS)} subreddits")
+            print(f"⚡ Up to {self.max_in_flight} requests in flight, {requests_per_minute} requests/min")
         except Exception as e:
             print(f"❌ Connection error: {e}")
             raise
 
+    def reset_stats(self):
+        """Per-stage timing counters (listing = network, filter = tag/question/score filter)"""
+        with self._stats_lock:
+            self.stats = {"listing_seconds": 0.0, "filter_seconds": 0.0,
+                          "transferred": 0, "scanned": 0, "accepted": 0}
+
+    def _add_stats(self, **values):
+        with self._stats_lock:
+            for key, value in values.items():
+                self.stats[key] += value
+
+    def _get_executor(self):
+        # Kept for the fetcher's lifetime so worker threads reuse their backend clients
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                                thread_name_prefix="reddit-fetch")
+        return self._executor
+
     def fetch_stories_by_tags(self, subreddits=None, tags=None, sort="top",
-                              timeframe="week", limit_per_sub=5, min_score=50, include_comments=False):
+                              timeframe="week", limit_per_sub=5, min_score=50, fetch_mode=None):
         if subreddits is None:
             subreddits = SUBREDDITS
         if tags is None:
             tags = VIRAL_TAGS
+        fetch_mode = fetch_mode or self.fetch_mode
+
+        tag_matcher = get_tag_matcher(tags)
+
+        # Search mode pushes the tag filter to Reddit; results still go through the same filters
+        search_queries = build_search_queries(tags) if fetch_mode == "search" else None
+
+        # Without history every subreddit gets the old fixed limit_per_sub * 2 listing
+        if self.scheduler is not None:
+            plan = self.scheduler.plan(subreddits, sort, timeframe, limit_per_sub, fetch_mode)
+        else:
+            plan = {sub: limit_per_sub * 2 for sub in subreddits}
+
+        skipped = [sub for sub in subreddits if not plan[sub]]
+        subreddits = [sub for sub in subreddits if plan[sub]]
+        if skipped:
+            print(f"💤 Skipping {len(skipped)} low-yield subreddits this run: {', '.join(skipped)}")
+
+        print(f"🔎 Searching across {len(subreddits)} subreddits ({fetch_mode} mode)...")
+
+        # Listings run in parallel; executor.map keeps results in subreddit order
+        results = self._get_executor().map(
+            lambda sub: self._fetch_subreddit(sub, tag_matcher, sort, timeframe,
+                                              limit_per_sub, min_score, plan[sub], search_queries),
+            subreddits
+        )
 
         stories = []
-        tags_lower = [tag.lower() for tag in tags]
-
-        print(f"🔎 Searching across {len(subreddits)} subreddits...")
-
-        for sub in subreddits:
-            try:
-                print(f"🔎 Fetching r/{sub}...")
-                subreddit_obj = self.reddit.subreddit(sub)
-
-                if sort == "top":
-                    submissions = subreddit_obj.top(time_filter=timeframe, limit=limit_per_sub * 2)
-                elif sort == "hot":
-                    submissions = subreddit_obj.hot(limit=limit_per_sub * 2)
-                elif sort == "new":
-                    submissions = subreddit_obj.new(limit=limit_per_sub * 2)
-                else:
-                    submissions = subreddit_obj.top(time_filter=timeframe, limit=limit_per_sub * 2)
-
-                count = 0
-                for submission in submissions:
-                    if count >= limit_per_sub:
-                        break
-
-                    title = submission.title
-                    title_lower = title.lower()
-
-                    if (any(tag in title_lower for tag in tags_lower) and
-                            is_story_post(title) and
-                            getattr(submission, 'score', 0) >= min_score and
-                            hasattr(submission, 'selftext')):
-
-                        story_text = submission.selftext.strip()
-                        if not story_text:
-                            continue
-
-                        story_data = {
-                            "title": title,
-                            "full_story": story_text,
-                            "story_length": len(story_text),
-                            "author": str(submission.author) if submission.author else "[deleted]",
-                            "score": submission.score,
-                            "num_comments": submission.num_comments,
-                            "url": submission.url,
-                            "permalink": submission.permalink,
-                            "subreddit": sub,
-                            "created_utc": submission.created_utc,
-                            "created_date": datetime.fromtimestamp(submission.created_utc).strftime(
-                                "%Y-%m-%d %H:%M:%S"),
-                            "has_comments": getattr(submission, 'comments', None) is not None
-                        }
-
-                        # Optionally include top comments
-                        if include_comments:
-                            try:
-                                submission.comments.replace_more(limit=0)
-                                top_comments = []
-                                for comment in submission.comments[:3]:
-                                    top_comments.append({
-                                        "author": str(comment.author) if comment.author else "[deleted]",
-                                        "score": comment.score,
-                                        "body": comment.body
-                                    })
-                                story_data["top_comments"] = top_comments
-                            except Exception:
-                                story_data["top_comments"] = []
-
-                        stories.append(story_data)
+        for sub_stories in results:
+            stories.extend(sub_stories)
+
+        # Stable sort: equal scores keep subreddit order, so merges are deterministic
+        stories.sort(key=lambda x: x['score'], reverse=True)
+        print(f"🚀 Total stories fetched: {len(stories)} ({self.request_budget.requests_made} API requests so far)")
+        return stories
+
+    def _fetch_subreddit(self, sub, tag_matcher, sort, timeframe, limit_per_sub, min_score, listing_limit,
+                         search_queries=None):
+        """Fetch and filter one subreddit listing (runs on a worker thread)"""
+        stories = []
+        try:
+            if self.verbose:
+                print(f"🔎 Fetching r/{sub} (depth {listing_limit})...")
+
+            # One request per listing page, all inside the budget
+            pages = max(1, -(-listing_limit // LISTING_PAGE_SIZE))
+            listing_start = time.perf_counter()
+            if search_queries:
+                submissions, transferred = self._search_subreddit(sub, search_queries, sort, timeframe,
+                                                                  listing_limit, pages)
+            else:
+                with self.request_budget.request(pages):
+                    submissions = self.backend.listing(sub, sort, timeframe, listing_limit)
+                transferred = len(submissions)
+            filter_start = time.perf_counter()
+
+            count = 0
+            scanned = 0
+            for submission in submissions:
+                if count >= limit_per_sub:
+                    break
+                scanned += 1
+
+                title = submission.title
+                title_lower = title.lower()
+
+                if (tag_matcher.is_match(title_lower) and
+                        is_story_post(title) and
+                        getattr(submission, 'score', 0) >= min_score and
+                        hasattr(submission, 'selftext')):
+
+                    # Known post: refresh its score only, never rebuild the story
+                    if self.seen_index is not None and self.seen_index.is_known(submission.permalink):
+                        self.seen_index.refresh(submission.permalink, submission.score, submission.num_comments)
                         count += 1
+                        continue
+
+                    story_text = submission.selftext.strip()
+                    if not story_text:
+                        continue
+
+                    story_data = {
+                        "title": title,
+                        "full_story": story_text,
+                        "story_length": len(story_text),
+                        "author": str(submission.author) if submission.author else "[deleted]",
+                        "score": submission.score,
+                        "num_comments": submission.num_comments,
+                        "url": submission.url,
+                        "permalink": submission.permalink,
+                        "subreddit": sub,
+                        "matched_tags": tag_matcher.matches(title_lower),
+                        "created_utc": submission.created_utc,
+                        "created_date": datetime.fromtimestamp(submission.created_utc).strftime(
+                            "%Y-%m-%d %H:%M:%S"),
+                        # From the listing itself - touching submission.comments would cost a request
+                        "has_comments": submission.num_comments > 0,
+                        "minhash": minhash_signature(story_text),
+                        "minhash_scheme": MINHASH_SCHEME
+                    }
+
+                    if self.duplicate_index is not None:
+                        duplicate_of, similarity = self.duplicate_index.check_and_insert(
+                            story_data["permalink"], story_data["minhash"])
+                        if duplicate_of:
+                            if self.verbose:
+                                print(f" 🪞 Near-duplicate ({similarity:.0%}) of {duplicate_of}: {title[:50]}")
+                            if DROP_NEAR_DUPLICATES:
+                                continue
+                            story_data["duplicate_of"] = duplicate_of
+
+                    if self.seen_index is not None:
+                        self.seen_index.add(story_data)
+                    if self.story_sink is not None:
+                        self.story_sink.write(story_data)
+
+                    stories.append(story_data)
+                    count += 1
+                    if self.verbose:
                         print(f" ✓ {title[:60]}... ({len(story_text)} chars)")
 
-            except Exception as e:
-                print(f"❌ Error fetching r/{sub}: {e}")
+            self._add_stats(listing_seconds=filter_start - listing_start,
+                            filter_seconds=time.perf_counter() - filter_start,
+                            transferred=transferred, scanned=scanned, accepted=len(stories))
+            if self.scheduler is not None:
+                self.scheduler.record(sub, sort, timeframe, scanned, count,
+                                      "search" if search_queries else "listing")
+
+        except Exception as e:
+            print(f"❌ Error fetching r/{sub}: {e}")
 
-        stories.sort(key=lambda x: x['score'], reverse=True)
-        print(f"🚀 Total stories fetched: {len(stories)}")
         return stories
 
     def get_comprehensive_stories(self, limit_per_sub=3, min_score=30):
@@ -185,8 +390,7 @@ class EnhancedRedditStoryFetcher:
             sort="top",
             timeframe="week",
             limit_per_sub=limit_per_sub,
-            min_score=min_score,  # Lowered from 100 to 30
-            include_comments=True
+            min_score=min_score  # Lowered from 100 to 30
         )
 
     def get_indian_relationship_stories(self, limit_per_sub=4, min_score=20):
@@ -202,10 +406,59 @@ class EnhancedRedditStoryFetcher:
             sort="top",
             timeframe="month",  # Look back further for Indian content
             limit_per_sub=limit_per_sub,
-            min_score=min_score,
-            include_comments=True
+            min_score=min_score
         )
 
+    def _search_subreddit(self, sub, search_queries, sort, timeframe, limit, pages):
+        """Run every batched tag query and merge the hits back into listing order
+
+        Returns (submissions, posts transferred) - the second counts every hit of every
+        query, before merging and truncation, since that is what came over the wire.
+        """
+        merged = {}
+        transferred = 0
+        for query in search_queries:
+            with self.request_budget.request(pages):
+                results = self.backend.search(sub, query, sort, timeframe, limit)
+            transferred += len(results)
+            for submission in results:
+                merged.setdefault(submission.permalink, submission)
+
+        submissions = list(merged.values())
+        if sort == "new":
+            submissions.sort(key=lambda s: s.created_utc, reverse=True)
+        elif sort != "hot":
+            submissions.sort(key=lambda s: s.score, reverse=True)
+        return submissions[:limit], transferred
+
+    def fetch_top_comments(self, stories, limit=3):
+        """Lazy comment stage: fetch top comments in parallel for stories that don't have them yet"""
+        missing = [s for s in stories if 'top_comments' not in s and s.get('permalink')]
+        if not missing:
+            print(f"💬 Top comments already cached for {len(stories)} stories")
+            return 0
+
+        print(f"💬 Fetching top comments for {len(missing)} stories...")
+        results = self._get_executor().map(lambda story: self._fetch_story_comments(story, limit), missing)
+
+        fetched = 0
+        for story, top_comments in zip(missing, results):
+            # Failures stay uncached so the next run retries them
+            if top_comments is not None:
+                story["top_comments"] = top_comments
+                fetched += 1
+
+        print(f"💬 Top comments fetched for {fetched}/{len(missing)} stories")
+        return fetched
+
+    def _fetch_story_comments(self, story, limit):
+        try:
+            with self.request_budget.request():
+                return self.backend.top_comments(story['permalink'], limit)
+        except Exception as e:
+            print(f"❌ Error fetching comments for {story.get('title', '')[:40]}: {e}")
+            return None
+
     def save_stories_to_yaml(self, stories, filename="viral_stories_full.yaml"):
         try:
             with open(filename, 'w', encoding='utf-8') as f:
@@ -223,6 +476,16 @@ class EnhancedRedditStoryFetcher:
         except Exception as e:
             print(f"❌ JSON save error: {e}")
 
+    def save_stories_to_sqlite(self, stories, filename="viral_stories.db"):
+        """Upsert stories into the SQLite corpus (full-text searchable by title and body)"""
+        try:
+            with SqliteStoryStore(filename) as store:
+                for story in stories:
+                    store.write(story)
+            print(f"✅ {len(stories)} stories saved to SQLite: {filename}")
+        except Exception as e:
+            print(f"❌ SQLite save error: {e}")
+
     def display_preview(self, stories, max_preview=5):
         print(f"\n🔎 Preview Top {min(max_preview, len(stories))} Stories:")
         for i, s in enumerate(stories[:max_preview], 1):
@@ -253,35 +516,75 @@ class EnhancedRedditStoryFetcher:
 def main():
     print("🔥 Enhanced Reddit Story Fetcher - 21 Subreddits Version\n")
 
-    fetcher = EnhancedRedditStoryFetcher()
-
-    print("🔎 Option 1: Comprehensive search across all 21 subreddits")
-    print("🔎 Option 2: Focus on Indian relationship subreddits")
-
-    # Option 1: Get stories from ALL subreddits
-    print("\n🚀 Fetching from all 21 subreddits...")
-    all_stories = fetcher.get_comprehensive_stories(limit_per_sub=2, min_score=25)
-
-    # Option 2: Also get Indian-focused stories
-    print("\n🇮🇳 Fetching Indian relationship stories...")
-    indian_stories = fetcher.get_indian_relationship_stories(limit_per_sub=3, min_score=15)
+    # Incremental mode: known posts only get their scores refreshed
+    seen_index = SeenPostIndex()
+    scheduler = SubredditScheduler()
+    existing_stories = load_stories_file(STORIES_FILE)
+    migrate_legacy = not existing_stories and Path(LEGACY_YAML_FILE).exists()
+    if migrate_legacy:
+        existing_stories = load_stories_file(LEGACY_YAML_FILE)
+        print(f"📦 Importing {len(existing_stories)} stories from {LEGACY_YAML_FILE} into {STORIES_FILE}")
+    seen_index.sync_with(existing_stories)
+
+    # LSH over every stored story; legacy stories without a signature get one now
+    duplicate_index = MinHashLSH()
+    for story in existing_stories:
+        duplicate_index.insert(story.get('permalink') or story['url'], story_signature(story))
+
+    # Stories are appended to the JSONL file the moment they pass the filters
+    with open_story_sink(STORIES_FILE) as sink:
+        if migrate_legacy:
+            for story in existing_stories:
+                sink.write(story)
+
+        fetcher = EnhancedRedditStoryFetcher(seen_index=seen_index, story_sink=sink,
+                                             duplicate_index=duplicate_index, scheduler=scheduler)
+        if existing_stories:
+            print(f"📂 {len(existing_stories)} existing stories in {STORIES_FILE}")
+
+        print("🔎 Option 1: Comprehensive search across all 21 subreddits")
+        print("🔎 Option 2: Focus on Indian relationship subreddits")
+
+        # Option 1: Get stories from ALL subreddits
+        print("\n🚀 Fetching from all 21 subreddits...")
+        all_stories = fetcher.get_comprehensive_stories(limit_per_sub=2, min_score=25)
+
+        # Option 2: Also get Indian-focused stories
+        print("\n🇮🇳 Fetching Indian relationship stories...")
+        indian_stories = fetcher.get_indian_relationship_stories(limit_per_sub=3, min_score=15)
+
+        # Refreshed scores go in as small patch records - story bodies are never rewritten
+        refreshed_stories = seen_index.apply_scores(existing_stories)
+        for story in refreshed_stories:
+            sink.write_patch(story, ("score", "num_comments"))
 
     # Combine and deduplicate
-    combined_stories = all_stories.copy()
-    existing_urls = {story['url'] for story in all_stories}
+    combined_stories = existing_stories.copy()
+    existing_urls = {story['url'] for story in existing_stories}
+    new_count = 0
 
-    for story in indian_stories:
+    for story in all_stories + indian_stories:
         if story['url'] not in existing_urls:
             combined_stories.append(story)
             existing_urls.add(story['url'])
+            new_count += 1
 
     # Sort by score
     combined_stories.sort(key=lambda x: x['score'], reverse=True)
 
+    print(f"\n📇 {new_count} new stories, {len(refreshed_stories)} stored stories with refreshed scores")
+    print(f"💾 {sink.written} records appended to {STORIES_FILE}")
+    flagged = sum(1 for story in all_stories + indian_stories if story.get('duplicate_of'))
+    print(f"🪞 {flagged} new stories flagged as near-duplicates")
+    seen_index.save()
+    scheduler.save()
+
+    if EXPORT_YAML and STORIES_FILE.endswith(".jsonl"):
+        convert_jsonl_to_yaml(STORIES_FILE, LEGACY_YAML_FILE)
+
     if combined_stories:
         fetcher.display_preview(combined_stories, max_preview=3)
         fetcher.display_subreddit_summary(combined_stories)
-        fetcher.save_stories_to_yaml(combined_stories)
 
         print(f"\n🎉 SUCCESS! {len(combined_stories)} stories saved!")
         print(f"📊 Stories from {len(set(s['subreddit'] for s in combined_stories))} different subreddits")
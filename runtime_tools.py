@@ -0,0 +1,122 @@
+import glob
+import shutil
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from json_files import load_json, atomic_write_json
+
+# --- Tool discovery configuration ---
+TOOL_CONFIG_FILE = "tool_paths.json"  # Discovered tool paths, reused by later runs and worker processes
+
+IMAGEMAGICK_SEARCH_PATTERNS = [
+    r"C:\Program Files\ImageMagick*\magick.exe",
+    r"C:\Program Files (x86)\ImageMagick*\magick.exe",
+    r"C:\ImageMagick*\magick.exe",
+]
+
+_config_lock = threading.Lock()
+
+
+# ----------- 1. DYNAMIC IMAGEMAGICK PATH DETECTION ------------
+def find_imagemagick_path():
+    """Dynamically find ImageMagick installation"""
+    print("🔍 Searching for ImageMagick...")
+
+    # Search in common directories
+    for pattern in IMAGEMAGICK_SEARCH_PATTERNS:
+        matches = glob.glob(pattern)
+        if matches:
+            found_path = matches[0]
+            print(f"📍 Found ImageMagick: {found_path}")
+            return found_path
+
+    # Try system PATH
+    path_magick = shutil.which("magick")
+    if path_magick:
+        print(f"📍 Found ImageMagick in PATH: {path_magick}")
+        return path_magick
+
+    return None
+
+
+def find_ffmpeg_path():
+    """ffmpeg on PATH, else the binary bundled with moviepy's imageio-ffmpeg"""
+    path_ffmpeg = shutil.which("ffmpeg")
+    if path_ffmpeg:
+        return path_ffmpeg
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+TOOL_FINDERS = {
+    "imagemagick": find_imagemagick_path,
+    "ffmpeg": find_ffmpeg_path,
+    "ffprobe": lambda: shutil.which("ffprobe"),
+}
+
+
+# ----------- 2. ON-DISK TOOL CONFIG -------------
+def load_tool_config(path=TOOL_CONFIG_FILE):
+    return load_json(path, {})
+
+
+def save_tool_config(config, path=TOOL_CONFIG_FILE):
+    atomic_write_json(path, config, indent=2)
+
+
+@lru_cache(maxsize=None)
+def get_tool_path(name, path=TOOL_CONFIG_FILE):
+    """Path of an external tool: cached config first, discovery only when missing or stale"""
+    with _config_lock:
+        config = load_tool_config(path)
+        cached = config.get(name)
+        if cached and Path(cached).exists():
+            return cached
+
+        found = TOOL_FINDERS[name]()
+        if found:
+            config[name] = found
+            try:
+                save_tool_config(config, path)
+            except OSError as e:
+                print(f"⚠️ Could not cache tool path for {name}: {e}")
+        return found
+
+
+# ----------- 3. LAZY RENDER SETUP -------------
+@lru_cache(maxsize=None)
+def ensure_imagemagick():
+    """Point moviepy at ImageMagick - only needed once a TextClip is about to be made"""
+    imagemagick_path = get_tool_path("imagemagick")
+    if not imagemagick_path:
+        print("❌ ImageMagick not found!")
+        raise SystemExit("Please install ImageMagick or add to PATH")
+
+    from moviepy.config import change_settings
+    print(f"✅ Using ImageMagick at: {imagemagick_path}")
+    change_settings({"IMAGEMAGICK_BINARY": imagemagick_path})
+    return imagemagick_path
+
+
+# ----------- 4. NLTK Punkt Tab Fix -------------
+@lru_cache(maxsize=None)
+def fix_nltk_dependencies():
+    import nltk
+    try:
+        nltk.data.find('tokenizers/punkt_tab')
+    except LookupError:
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            nltk.download('punkt')
+
+
+def sent_tokenize(text):
+    """nltk sent_tokenize, importing nltk (and fetching punkt) on first use"""
+    fix_nltk_dependencies()
+    from nltk.tokenize import sent_tokenize as nltk_sent_tokenize
+    return nltk_sent_tokenize(text)
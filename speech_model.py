@@ -0,0 +1,188 @@
+import re
+import threading
+
+from json_files import load_json, atomic_write_json
+
+# --- Speech-rate model configuration ---
+SPEECH_MODEL_FILE = "speech_models.json"
+FEATURE_NAMES = ("intercept", "chars", "words", "minor_pauses", "major_pauses")
+RIDGE = 1e-6  # Keeps the normal equations solvable for tiny / degenerate calibration sets
+
+_MINOR_PAUSE_RE = re.compile(r"[,;:—–]|\s-\s")
+_MAJOR_PAUSE_RE = re.compile(r"[.!?]+")
+
+# Reference corpus synthesized once per voice / rate: mixed lengths, numbers, quotes and
+# punctuation so the fit sees the pauses real Reddit stories have
+REFERENCE_SENTENCES = (
+    "I never thought this would happen to me.",
+    "We had been together for almost six years, and honestly, I thought I knew him.",
+    "Then everything changed in one night.",
+    "My sister, who is twenty-eight, asked me to babysit again; I said no.",
+    "Wait. What?",
+    "She looked at me and said, \"You always do this!\"",
+    "Looking back, the signs were all there: the late nights, the new passwords, the sudden gym membership.",
+    "I'm not sure what to do anymore.",
+    "My mom called at 3 a.m. to tell me the wedding was off.",
+    "It cost us $2,400, which is a lot of money for two college students.",
+    "Update: we talked. It went better than expected.",
+    "He refused to apologize, so I packed my things and left - no note, no goodbye.",
+    "Am I wrong for being upset? Maybe. But I don't think so.",
+    "The whole family was there: aunts, uncles, cousins, even my grandmother.",
+    "Nobody said a word.",
+    "I (25F) have been friends with Clare (26F) since kindergarten, and until last month we had never fought.",
+    "So, here we are.",
+    "Thank you all for the kind messages; I read every single one of them, even the mean ones.",
+    "TLDR: she gave me a dog and now I'm the one who has to move out.",
+    "Anyway, that's the story of how I ruined my best friend's birthday party.",
+)
+
+_model_lock = threading.Lock()
+
+
+def speech_features(text):
+    """Feature vector for one utterance: intercept, chars, words, minor / major pause counts"""
+    return [1.0, float(len(text)), float(len(text.split())),
+            float(len(_MINOR_PAUSE_RE.findall(text))), float(len(_MAJOR_PAUSE_RE.findall(text)))]
+
+
+def calibration_utterances(sentences=REFERENCE_SENTENCES):
+    """Single sentences plus short runs of them - chunk-sized texts like the renderer speaks"""
+    utterances = list(sentences)
+    for size in (2, 3):
+        utterances += [" ".join(sentences[i:i + size]) for i in range(0, len(sentences) - size + 1, size)]
+    return utterances
+
+
+def _solve(matrix, vector):
+    """Gaussian elimination with partial pivoting (the system is only 5 x 5)"""
+    n = len(vector)
+    rows = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        if abs(rows[col][col]) < 1e-12:
+            continue
+        for r in range(n):
+            if r != col:
+                factor = rows[r][col] / rows[col][col]
+                for c in range(col, n + 1):
+                    rows[r][c] -= factor * rows[col][c]
+    return [rows[i][n] / rows[i][i] if abs(rows[i][i]) >= 1e-12 else 0.0 for i in range(n)]
+
+
+def fit_coefficients(feature_rows, seconds):
+    """Least squares (normal equations + a tiny ridge) for seconds ~ features"""
+    k = len(FEATURE_NAMES)
+    xtx = [[sum(row[i] * row[j] for row in feature_rows) + (RIDGE if i == j else 0.0) for j in range(k)]
+           for i in range(k)]
+    xty = [sum(row[i] * y for row, y in zip(feature_rows, seconds)) for i in range(k)]
+    return _solve(xtx, xty)
+
+
+# --- Per-voice / rate model ---
+class SpeechRateModel:
+    """Predicts TTS seconds for a text from character, word and punctuation counts"""
+
+    def __init__(self, voice, rate, coefficients=None, samples=0, rmse=None):
+        self.voice = voice
+        self.rate = rate
+        self.coefficients = coefficients
+        self.samples = samples
+        self.rmse = rmse
+
+    @property
+    def calibrated(self):
+        return self.coefficients is not None
+
+    def predict(self, text):
+        if not text:
+            return 0.0
+        if not self.calibrated:
+            # Uncalibrated: the old words-per-minute rule
+            return len(text.split()) * 60 / self.rate
+        return max(0.0, sum(c * x for c, x in zip(self.coefficients, speech_features(text))))
+
+    @property
+    def intercept(self):
+        """Fixed seconds every synthesized utterance costs once (0 when uncalibrated)"""
+        return self.coefficients[0] if self.calibrated else 0.0
+
+    def predict_span(self, text):
+        """Seconds a text adds inside a longer utterance - no intercept, so spans can be summed"""
+        if not text:
+            return 0.0
+        if not self.calibrated:
+            return len(text.split()) * 60 / self.rate
+        return max(0.0, sum(c * x for c, x in zip(self.coefficients[1:], speech_features(text)[1:])))
+
+    def predict_utterance(self, texts):
+        """Seconds for texts spoken back to back as one utterance: one intercept plus every span"""
+        spans = sum(self.predict_span(text) for text in texts)
+        return max(0.0, self.intercept + spans) if spans else 0.0
+
+    def fit(self, texts, seconds):
+        rows = [speech_features(text) for text in texts]
+        self.coefficients = fit_coefficients(rows, seconds)
+        self.samples = len(texts)
+        errors = [self.predict(text) - actual for text, actual in zip(texts, seconds)]
+        self.rmse = (sum(e * e for e in errors) / len(errors)) ** 0.5 if errors else None
+        return self
+
+    def to_dict(self):
+        return {"voice": self.voice, "rate": self.rate, "coefficients": self.coefficients,
+                "samples": self.samples, "rmse": self.rmse}
+
+
+def model_key(voice, rate):
+    return f"{voice}|{rate}"
+
+
+def load_speech_model(voice, rate, path=SPEECH_MODEL_FILE):
+    """Calibrated model for this voice / rate, else an uncalibrated words-per-minute one"""
+    data = load_json(path, {}, "speech models").get(model_key(voice, rate))
+    if data and data.get("coefficients"):
+        return SpeechRateModel(voice, rate, data["coefficients"], data.get("samples", 0), data.get("rmse"))
+    return SpeechRateModel(voice, rate)
+
+
+def save_speech_model(model, path=SPEECH_MODEL_FILE):
+    with _model_lock:
+        models = load_json(path, {}, "speech models")
+        models[model_key(model.voice, model.rate)] = model.to_dict()
+        atomic_write_json(path, models, indent=2)
+
+
+# --- Prediction error tracking for a run ---
+class PredictionLog:
+    """Predicted vs actual narration seconds, reported at the end of a run"""
+
+    def __init__(self):
+        self.chunks = []
+        self.parts = []
+
+    def add_chunk(self, predicted, actual):
+        self.chunks.append((predicted, actual))
+
+    def add_part(self, predicted, actual):
+        self.parts.append((predicted, actual))
+
+    @staticmethod
+    def _summary(pairs):
+        predicted = sum(p for p, _ in pairs)
+        actual = sum(a for _, a in pairs)
+        mean_abs_pct = sum(abs(p - a) / a for p, a in pairs if a) / max(1, sum(1 for _, a in pairs if a))
+        return predicted, actual, mean_abs_pct
+
+    def report(self, model):
+        if not self.chunks:
+            return
+        label = f"calibrated, {model.samples} samples" if model.calibrated else f"uncalibrated {model.rate} WPM"
+        print(f"\n🎯 Duration prediction ({label}):")
+        predicted, actual, error = self._summary(self.chunks)
+        print(f"   • Chunks: {len(self.chunks)} - predicted {predicted:.1f}s, actual {actual:.1f}s, "
+              f"mean abs error {error:.1%}")
+        if self.parts:
+            predicted, actual, error = self._summary(self.parts)
+            worst = max(abs(p - a) for p, a in self.parts)
+            print(f"   • Parts: {len(self.parts)} - predicted {predicted:.1f}s, actual {actual:.1f}s, "
+                  f"mean abs error {error:.1%}, worst {worst:.1f}s")
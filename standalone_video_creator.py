@@ -6,79 +6,48 @@ import json
 import re
 from datetime import datetime
 from pathlib import Path
-import nltk
-from nltk.tokenize import sent_tokenize
-from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, concatenate_audioclips
-from moviepy.config import change_settings
-from pydub import AudioSegment
 import shutil
 import atexit
-import glob
-
-
-# ----------- 1. DYNAMIC IMAGEMAGICK PATH DETECTION ------------
-def find_imagemagick_path():
-    """Dynamically find ImageMagick installation"""
-    search_patterns = [
-        r"C:\Program Files\ImageMagick*\magick.exe",
-        r"C:\Program Files (x86)\ImageMagick*\magick.exe",
-        r"C:\ImageMagick*\magick.exe",
-    ]
-
-    print("🔍 Searching for ImageMagick...")
-
-    # Search in common directories
-    for pattern in search_patterns:
-        matches = glob.glob(pattern)
-        if matches:
-            found_path = matches[0]
-            print(f"📍 Found ImageMagick: {found_path}")
-            return found_path
-
-    # Try system PATH
-    path_magick = shutil.which("magick")
-    if path_magick:
-        print(f"📍 Found ImageMagick in PATH: {path_magick}")
-        return path_magick
-
-    return None
-
-
-IMAGEMAGICK_PATH = find_imagemagick_path()
-
-if not IMAGEMAGICK_PATH:
-    print("❌ ImageMagick not found!")
-    raise SystemExit("Please install ImageMagick or add to PATH")
-
-print(f"✅ Using ImageMagick at: {IMAGEMAGICK_PATH}")
-change_settings({"IMAGEMAGICK_BINARY": IMAGEMAGICK_PATH})
-
-
-# ----------- 2. NLTK Punkt Tab Fix -------------
-def fix_nltk_dependencies():
-    try:
-        nltk.data.find('tokenizers/punkt_tab')
-    except LookupError:
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt')
-
-
-fix_nltk_dependencies()
-
-
-# ----------- 3. TEMP FILE CLEANUP MANAGER -------------
+from runtime_tools import ensure_imagemagick, get_tool_path, sent_tokenize
+from text_normalizer import TextNormalizer
+from tts_timing import chunk_spans
+from audio_meta import audio_duration, probe_stats
+from caption_renderer import render_caption, caption_clip, find_font_file
+from ffmpeg_render import render_part, caption_png, caption_track, has_filter, VIDEO_WIDTH, VIDEO_HEIGHT
+from karaoke_captions import WordAtlas, word_timings, karaoke_wrap
+from subtitles import ass_style, write_subtitles
+from audio_assembly import assemble_narration, write_wav, narration_audio_clip
+from tts_cache import TTSCache, tts_cache_key
+from story_document import StoryDocument, SegmentationCache, linear_partition
+from speech_model import (SpeechRateModel, PredictionLog, load_speech_model, save_speech_model,
+                          calibration_utterances)
+from story_store import (open_story_sink, load_stories_file, normalize_score, story_features, story_key,
+                         story_index_path, story_index_is_current, build_story_index, read_story_index,
+                         read_story_records, migrate_legacy_corpus, SqliteStoryStore, STORY_DB_SUFFIXES)
+
+# Importing this module has no side effects: ImageMagick is located (and cached in
+# tool_paths.json) and moviepy / nltk are imported only once a render starts.
+
+
+# ----------- TEMP FILE CLEANUP MANAGER -------------
 class TempFileManager:
     def __init__(self):
         self.temp_folders = set()
         self.temp_files = set()
-        atexit.register(self.cleanup_all)
+        self._exit_hook_registered = False
+
+    def _register_exit_hook(self):
+        # Registered on first use so importing the module leaves no exit hook behind
+        if not self._exit_hook_registered:
+            atexit.register(self.cleanup_all)
+            self._exit_hook_registered = True
 
     def register_temp_folder(self, folder_path):
+        self._register_exit_hook()
         self.temp_folders.add(Path(folder_path))
 
     def register_temp_file(self, file_path):
+        self._register_exit_hook()
         self.temp_files.add(Path(file_path))
 
     def cleanup_all(self):
@@ -110,10 +79,13 @@ temp_manager = TempFileManager()
 
 
 class FixedSequentialRedditVideoCreator:
-    def __init__(self, stories_file="viral_stories_full.yaml",
+    def __init__(self, stories_file="viral_stories_full.jsonl",
                  background_videos_path="processed_backgrounds/batch_20250802_030654",
-                 output_path="reddit_shorts/"):
+                 output_path="reddit_shorts/", story_query=None):
         self.stories_file = Path(stories_file)
+        # With an SQLite corpus (.db) stories are selected by query, e.g.
+        # {"text": "marriage", "max_seconds": 90, "min_score": 500, "subreddits": ["TwoXIndia"]}
+        self.story_query = story_query or {}
         self.background_path = Path(background_videos_path)
 
         # ========== DATE-WISE FOLDER CREATION ==========
@@ -137,12 +109,42 @@ class FixedSequentialRedditVideoCreator:
         self.default_font = "Anton"  # Tall & bold
         self.textblock_width = 880
         self.wrap_chars_per_line = 20
+        # "pillow": native stroked captions, memoized (no ImageMagick needed)
+        # "imagemagick": moviepy TextClip, one ImageMagick call per caption
+        self.caption_renderer = "pillow"
+        # "ffmpeg": the whole part in one ffmpeg filtergraph (timed overlays, native threads)
+        # "subtitles": ffmpeg burns the part's ASS file in with libass - no caption images at all
+        # "moviepy": CompositeVideoClip, every frame blended in Python
+        self.render_backend = "ffmpeg"
+        self.export_subtitles = True  # .ass + .srt next to every video, for soft captions on upload
+        # "chunk": one caption block per 8-25 word chunk
+        # "karaoke": the same block with the word being spoken highlighted (Pillow word sprites)
+        self.caption_mode = "chunk"
+        self.karaoke_highlight_color = 'yellow'
+        self._word_atlas = None
 
         # ========== TIMING CONFIGURATION ==========
         self.text_start_delay = -0.15  # Delay before text appears
         self.text_duration_factor = 1.0  # Text display duration multiplier
         self.text_transition_gap = 0.15  # Gap between text chunks
         self.words_per_minute = 230  # TTS speech speed
+        self.tts_volume = 0.93
+        # "utterance": one WAV per part, chunk timings taken from pauses in the audio
+        # "chunks": one WAV per chunk (the old behaviour)
+        self.tts_mode = "utterance"
+        # Synthesized audio is reused across runs (keyed by text, voice, rate, volume, engine)
+        self.tts_cache = TTSCache()
+        self.tts_voice = None
+        self.tts_engine_version = None
+        # Narration for all parts of a story is synthesized up front by a process pool
+        # (one pyttsx3 engine per worker); 1 = synthesize in-process, part by part
+        self.tts_workers = min(8, os.cpu_count() or 1)
+        self._tts_pool = None
+        self._prefetched_keys = set()  # Already counted as a cache hit / miss by prefetch_tts
+        # Narration is assembled into one NumPy track; False = write it to a single temp WAV instead
+        self.narration_in_memory = True
+        # Planning uses a per-voice / rate model fitted on a reference corpus (synthesized once)
+        self.calibrate_speech_model = True
 
         # ========== PART INDICATOR CONFIGURATION ==========
         self.part_indicator_color = 'cyan'  # Color for "Part X of Y" text
@@ -157,48 +159,142 @@ class FixedSequentialRedditVideoCreator:
         # Background video cycling
         self.video_counter = 0
 
+        # Markdown / BoRU boilerplate is stripped before narration (cached by content hash)
+        self.text_normalizer = TextNormalizer()
+        # Sentence segmentation runs once per story text (cached by content hash)
+        self.segmentation_cache = SegmentationCache()
+        self._filename_bases = {}
+
+        # Uncalibrated until the TTS voice is known - falls back to words_per_minute
+        self.speech_model = SpeechRateModel(None, self.words_per_minute)
+        self.prediction_log = PredictionLog()
+
+        # Top comments are fetched lazily, only for stories selected for rendering
+        self.fetch_top_comments = True
+
         self.debug_mode = True
 
-        print(f"🚀 FIXED Sequential Video Creator (NO THREADING)")
+        print(f"🚀 FIXED Sequential Video Creator (stories rendered one at a time)")
+        print(f"🧵 TTS: {self.tts_workers} pool worker(s), {self.tts_mode} mode")
         print(f"📁 Output: {self.output_path}")
         print(f"🎵 Speech: {self.words_per_minute} WPM")
         print(f"📚 Max stories: {self.max_stories_total}")
         print(f"📺 Max videos per story: {self.max_videos_per_story}")
         print(f"⏰ Max video duration: {self.max_video_duration}s (2 min)")
 
-    def load_stories(self):
-        """Load stories and sort by popularity"""
+    def load_story_index(self):
+        """Load per-story features (word count, duration, parts, score) without the story text"""
+        f = self.stories_file
+        if f.suffix in STORY_DB_SUFFIXES:
+            # Selection runs as an indexed SQL / FTS query, not a scan
+            with SqliteStoryStore(f) as store:
+                entries = store.select_features(words_per_minute=self.words_per_minute, **self.story_query)
+            if self.story_query:
+                print(f"🔍 Story query {self.story_query}: {len(entries)} matches")
+        elif f.suffix == ".jsonl":
+            # First run before the fetcher has written a JSONL corpus: import the shipped YAML / JSON
+            migrate_legacy_corpus(f)
+            index_path = story_index_path(f)
+            if f.exists() and not story_index_is_current(f, index_path):
+                build_story_index(f)
+            entries = read_story_index(index_path) if index_path.exists() else []
+        else:
+            # YAML / JSON have no sidecar index - compute the features in memory
+            entries = []
+            for story in load_stories_file(f):
+                entry = story_features(story, self.words_per_minute)
+                entry["story"] = story
+                entries.append(entry)
+
+        duplicates = sum(1 for entry in entries if entry.get('duplicate_of'))
+        if duplicates:
+            entries = [entry for entry in entries if not entry.get('duplicate_of')]
+            print(f"🪞 Skipping {duplicates} near-duplicate stories")
+
+        entries.sort(key=lambda e: e['score'], reverse=True)
+        print(f"🗂️ Indexed {len(entries)} stories")
+        return entries
+
+    def part_budget(self, title_seconds):
+        """Narration seconds left for body sentences in each part of a multi-part story"""
+        # Every part repeats the title and opens with the part indicator silence
+        return self.max_video_duration - self.part_indicator_silence - title_seconds
+
+    def plan_parts(self, title_seconds, body_seconds):
+        """(estimated seconds, fewest parts) - the one budget shared by planning and splitting"""
+        estimated_duration = title_seconds + body_seconds
+        if estimated_duration <= self.max_video_duration:
+            return estimated_duration, 1
+        part_budget = self.part_budget(title_seconds)
+        if part_budget <= 0:
+            return estimated_duration, float('inf')
+        return estimated_duration, max(2, -int(-body_seconds // part_budget))
+
+    def plan_story(self, entry):
+        """Estimated narration seconds and part count from index features alone
+
+        The title is timed with the speech model, like split_story_for_2min_limit
+        does; the body only has a word count here, so it is timed at words_per_minute.
+        """
+        title = f"{entry.get('title') or ''}."
+        title_seconds = self.speech_model.intercept + self.speech_model.predict_span(title)
+        body_words = max(0, entry['word_count'] - len(title.split()))
+        return self.plan_parts(title_seconds, body_words * 60 / self.words_per_minute)
+
+    def read_story(self, entry):
+        """Open the full story text - only done for stories that actually get rendered"""
+        if 'story' in entry:
+            return entry['story']
+        if self.stories_file.suffix in STORY_DB_SUFFIXES:
+            with SqliteStoryStore(self.stories_file) as store:
+                return store.get(entry['key'])
+        return read_story_records(self.stories_file, entry['records'])
+
+    def save_stories(self, updated_stories, fields):
+        """Write story updates back (JSONL gets patch records, SQLite is updated, YAML/JSON are rewritten)"""
         f = self.stories_file
         try:
-            if f.suffix == ".yaml":
-                with open(f, 'r', encoding='utf-8') as h:
-                    stories = yaml.safe_load(h)
-            elif f.suffix == ".json":
-                with open(f, 'r', encoding='utf-8') as h:
-                    stories = json.load(h)
-            else:
-                raise Exception(f"Story file suffix not recognized: {f}")
-
-            # Sort by score (popularity)
-            stories_with_scores = []
+            if f.suffix == ".jsonl" or f.suffix in STORY_DB_SUFFIXES:
+                with open_story_sink(f) as sink:
+                    for story in updated_stories:
+                        sink.write_patch(story, fields)
+                print(f"💾 Saved {len(updated_stories)} story updates to: {f}")
+                return
+
+            # Patch the touched records in the file as stored: every story (flagged duplicates
+            # included) stays, in its original order
+            updates = {story_key(story): story for story in updated_stories}
+            stories = load_stories_file(f)
             for story in stories:
-                score = story.get('score', 0)
-                if isinstance(score, str):
-                    try:
-                        score = int(score.replace(',', '').replace('k', '000').replace('K', '000'))
-                    except:
-                        score = 0
-                stories_with_scores.append((story, score))
-
-            stories_with_scores.sort(key=lambda x: x[1], reverse=True)
-            sorted_stories = [story for story, score in stories_with_scores]
-
-            print(f"📚 Loaded {len(sorted_stories)} total stories")
-            return sorted_stories
+                updated = updates.get(story_key(story))
+                if updated is not None:
+                    story.update({field: updated[field] for field in fields if field in updated})
+
+            with open(f, 'w', encoding='utf-8') as h:
+                if f.suffix == ".yaml":
+                    yaml.dump(stories, h, allow_unicode=True, sort_keys=False,
+                              default_flow_style=False, indent=2)
+                else:
+                    json.dump(stories, h, ensure_ascii=False, indent=2)
+            print(f"💾 Updated story file: {f}")
+        except Exception as e:
+            print(f"❌ Error saving stories: {e}")
 
+    def attach_top_comments(self, selected_stories):
+        """Fetch top comments for the selected stories only and cache them in the story file"""
+        if not self.fetch_top_comments:
+            return
+        missing = [s for s in selected_stories if 'top_comments' not in s]
+        try:
+            from reddit_story_fetcher import EnhancedRedditStoryFetcher
+            fetched = EnhancedRedditStoryFetcher().fetch_top_comments(selected_stories)
         except Exception as e:
-            print(f"❌ Error loading stories: {e}")
-            return []
+            print(f"⚠️ Skipping top comments: {e}")
+            return
+
+        if fetched:
+            updated = [s for s in missing if 'top_comments' in s]
+            self.save_stories(updated, fields=("top_comments",))
 
     def get_background_videos(self):
         videos = []
@@ -218,6 +314,17 @@ class FixedSequentialRedditVideoCreator:
 
     def generate_smart_filename(self, story_title, story_index, part_number=None, total_parts=1):
         """Generate smart filename from story title"""
+        filename_base = self._filename_bases.get(story_title)
+        if filename_base is None:
+            filename_base = self._filename_bases[story_title] = self.smart_filename_base(story_title)
+
+        if total_parts > 1:
+            return f"{filename_base}_{story_index:03d}_part_{part_number:02d}"
+        else:
+            return f"{filename_base}_{story_index:03d}"
+
+    def smart_filename_base(self, story_title):
+        """Filename stem from the title - computed once per story, shared by all its parts"""
         title = story_title.lower().strip()
 
         # Remove Reddit prefixes
@@ -241,125 +348,241 @@ class FixedSequentialRedditVideoCreator:
 
         if len(filename_base) > 40:
             filename_base = filename_base[:40]
+        return filename_base
 
-        if total_parts > 1:
-            return f"{filename_base}_{story_index:03d}_part_{part_number:02d}"
-        else:
-            return f"{filename_base}_{story_index:03d}"
+    def build_story_document(self, story):
+        """Segment the story once - part splitting, chunking and estimates all reuse it"""
+        return StoryDocument.from_story(story, sent_tokenize, self.segmentation_cache)
+
+    def estimate_sentence_seconds(self, doc):
+        """Predicted narration seconds per sentence of the document, without the per-utterance intercept"""
+        return [self.speech_model.predict_span(doc.sentence(i)) for i in range(len(doc))]
 
-    def split_story_for_2min_limit(self, story):
-        """Split story into parts based on 2-minute limit"""
-        title = story.get('title', '')
-        content = story.get('full_story', '')
-        full_script = f"{title}. {content}"
+    def split_story_for_2min_limit(self, doc):
+        """Split story into parts based on 2-minute limit -> body sentence ranges (start, end)
 
-        total_words = len(full_script.split())
-        estimated_duration = (total_words * 60) / self.words_per_minute
+        Parts are balanced on estimated sentence durations (optimal linear partition,
+        minimizing the longest part). Returns [] when the story can't fit in
+        max_videos_per_story parts - decided here, before any TTS is spent on it.
+        Each part is spoken as one utterance, so the model's intercept is counted
+        once per part rather than once per sentence.
+        """
+        body_start, body_end = doc.body_range
+        sentence_seconds = self.estimate_sentence_seconds(doc)
+        title_seconds = self.speech_model.intercept + sum(sentence_seconds[:body_start])
+        body_seconds = sentence_seconds[body_start:body_end]
+        estimated_duration, min_parts = self.plan_parts(title_seconds, sum(body_seconds))
 
-        print(f"📝 Story: {total_words} words (~{estimated_duration:.1f}s)")
+        print(f"📝 Story: {doc.total_words} words (~{estimated_duration:.1f}s)")
 
         # If fits in 2 minutes, don't split
-        if estimated_duration <= self.max_video_duration:
+        if min_parts == 1:
             print(f"✅ Single video ({estimated_duration:.1f}s ≤ {self.max_video_duration}s)")
-            return [full_script]
+            return [(body_start, body_end)]
 
-        # Calculate parts needed (max 3 per story)
-        ideal_parts = int(estimated_duration / self.max_video_duration) + 1
-        actual_parts = min(ideal_parts, self.max_videos_per_story)
+        part_budget = self.part_budget(title_seconds)
+        if part_budget <= 0 or (body_seconds and max(body_seconds) > part_budget):
+            print(f"❌ A single sentence or the title alone exceeds the {self.max_video_duration}s limit - skipping")
+            return []
 
-        if ideal_parts > self.max_videos_per_story:
-            print(f"⚠️ Would need {ideal_parts} parts, limiting to {self.max_videos_per_story}")
+        # Fewest parts whose optimal split keeps the longest part under the limit (max 3 per story)
+        for actual_parts in range(min_parts, self.max_videos_per_story + 1):
+            bounds, longest = linear_partition(body_seconds, actual_parts)
+            if longest <= part_budget:
+                break
+        else:
+            print(f"❌ Needs more than {self.max_videos_per_story} parts (~{estimated_duration:.0f}s of narration, "
+                  f"{self.max_video_duration}s per part) - skipping before TTS")
+            return []
 
         print(f"📊 Creating {actual_parts} parts for 2-minute limit")
 
-        # Split content into sentences
-        sentences = [s.strip() for s in sent_tokenize(content) if s.strip()]
-        sentences_per_part = len(sentences) // actual_parts
-
-        parts = []
-        for part_num in range(actual_parts):
-            if part_num == actual_parts - 1:
-                # Last part gets remaining sentences
-                part_sentences = sentences[part_num * sentences_per_part:]
-            else:
-                part_sentences = sentences[part_num * sentences_per_part:(part_num + 1) * sentences_per_part]
-
-            part_content = f"{title}. " + " ".join(part_sentences)
-            if part_content.strip():
-                parts.append(part_content.strip())
-
-        for i, part in enumerate(parts, 1):
-            part_words = len(part.split())
-            part_duration = (part_words * 60) / self.words_per_minute
-            print(f"   Part {i}: {part_words} words (~{part_duration:.1f}s)")
+        parts = [(body_start + start, body_start + end) for start, end in bounds]
+        for i, (start, end) in enumerate(parts, 1):
+            part_duration = self.part_indicator_silence + title_seconds + sum(
+                sentence_seconds[start:end])
+            print(f"   Part {i}: {doc.part_words(start, end)} words (~{part_duration:.1f}s)")
 
         return parts
 
-    def split_and_sync_chunks(self, story_text):
-        """Split story part into chunks"""
-        sentences = [s.strip() for s in sent_tokenize(story_text) if s.strip()]
-
+    def split_and_sync_chunks(self, doc, start, end):
+        """Split story part into chunks (from the document's precomputed sentences / word counts)"""
         min_length = 8
         max_length = 25
         chunks = []
-        buffer = ""
+        buffer = []
+        buffer_words = 0
 
-        for s in sentences:
-            buffer_words = len(buffer.split())
-            sentence_words = len(s.split())
+        for i in doc.part_sentences(start, end):
+            sentence_words = doc.words[i]
 
-            if buffer_words < min_length:
-                buffer = (buffer + " " + s).strip()
-            elif buffer_words + sentence_words <= max_length:
-                buffer = (buffer + " " + s).strip()
+            if buffer_words < min_length or buffer_words + sentence_words <= max_length:
+                buffer.append(i)
+                buffer_words += sentence_words
             else:
                 if buffer:
                     chunks.append(buffer)
-                buffer = s
+                buffer = [i]
+                buffer_words = sentence_words
 
         if buffer:
             chunks.append(buffer)
 
         print(f"🔍 Split into {len(chunks)} chunks")
-        return [c for c in chunks if c]
+        return [" ".join(doc.sentence(i) for i in chunk) for chunk in chunks]
 
-    def generate_tts_chunks_and_durations(self, chunks):
-        """Generate TTS - NO THREADING"""
+    def init_tts_engine(self):
+        """pyttsx3 engine with the configured rate, volume and female voice"""
         import pyttsx3
-        engine = pyttsx3.init()
-        engine.setProperty('rate', self.words_per_minute)
-        engine.setProperty('volume', 0.93)
-
-        # Select female voice
-        for voice in engine.getProperty('voices'):
-            if voice and hasattr(voice, 'name'):
-                if 'zira' in voice.name.lower() or 'female' in voice.name.lower():
-                    engine.setProperty('voice', voice.id)
-                    break
-
-        # Generate TTS files
+        from tts_pool import configure_engine
+        engine = configure_engine(pyttsx3.init(), self.words_per_minute, self.tts_volume)
+
+        self.tts_voice = engine.getProperty('voice') or "default"
+        driver = getattr(getattr(engine, 'proxy', None), '_driver', None)
+        self.tts_engine_version = f"pyttsx3 {getattr(pyttsx3, '__version__', '?')} {type(driver).__module__}"
+        return engine
+
+    def tts_key(self, text):
+        """TTS cache key - the voice is looked up once, so full cache hits never touch the engine"""
+        if self.tts_voice is None:
+            self.init_tts_engine()
+        return tts_cache_key(text, self.tts_voice, self.words_per_minute, self.tts_volume,
+                             self.tts_engine_version)
+
+    def load_speech_model(self):
+        """Speech-rate model for the active voice / rate, calibrating it on first use"""
+        try:
+            engine = self.init_tts_engine()
+            voice = engine.getProperty('voice') or "default"
+        except Exception as e:
+            print(f"⚠️ TTS engine unavailable, planning at {self.words_per_minute} WPM: {e}")
+            return self.speech_model
+
+        model = load_speech_model(voice, self.words_per_minute)
+        if not model.calibrated and self.calibrate_speech_model:
+            model = self.calibrate_speech_rate(engine, voice)
+        if model.calibrated:
+            print(f"🎯 Speech model: {voice} @ {self.words_per_minute} (RMSE {model.rmse:.2f}s, "
+                  f"{model.samples} samples)")
+        return model
+
+    def calibrate_speech_rate(self, engine, voice):
+        """Synthesize the reference corpus once and fit chars / words / pauses -> seconds"""
+        texts = calibration_utterances()
+        print(f"🎯 Calibrating speech model for {voice} @ {self.words_per_minute} ({len(texts)} utterances)...")
+
         wavfiles = []
-        print(f"🎵 Generating TTS for {len(chunks)} chunks at {self.words_per_minute} WPM...")
+        for i, text in enumerate(texts, 1):
+            wav_path = self.temp_path / f"calibration_{i}_{datetime.now().strftime('%H%M%S_%f')}.wav"
+            engine.save_to_file(text, str(wav_path))
+            wavfiles.append(wav_path)
+            temp_manager.register_temp_file(wav_path)
+        engine.runAndWait()
 
-        for i, chunk in enumerate(chunks, 1):
-            chunk_path = self.temp_path / f"tts_chunk_{i}_{datetime.now().strftime('%H%M%S_%f')}.wav"
-            engine.save_to_file(chunk, str(chunk_path))
-            wavfiles.append(str(chunk_path))
-            temp_manager.register_temp_file(chunk_path)
+        try:
+            seconds = [audio_duration(wav_path) for wav_path in wavfiles]
+        except Exception as e:
+            print(f"⚠️ Calibration failed, planning at {self.words_per_minute} WPM: {e}")
+            return SpeechRateModel(voice, self.words_per_minute)
+
+        model = SpeechRateModel(voice, self.words_per_minute).fit(texts, seconds)
+        save_speech_model(model)
+        return model
+
+    def get_tts_pool(self):
+        if self._tts_pool is None:
+            from tts_pool import TTSPool
+            print(f"🧵 Starting TTS pool with {self.tts_workers} workers")
+            self._tts_pool = TTSPool(self.words_per_minute, self.tts_volume, workers=self.tts_workers)
+        return self._tts_pool
+
+    def close_tts_pool(self):
+        if self._tts_pool is not None:
+            self._tts_pool.close()
+            self._tts_pool = None
+
+    def story_tts_texts(self, part_chunks):
+        """Every utterance a story synthesizes: whole parts in utterance mode, chunks in chunk mode"""
+        if self.tts_mode == "utterance":
+            return [" ".join(chunks) for chunks in part_chunks]
+        return [chunk for chunks in part_chunks for chunk in chunks]
+
+    def prefetch_tts(self, part_chunks):
+        """Synthesize every uncached utterance of a story in parallel, straight into the TTS cache
+
+        The per-part generate_tts_* calls then run as cache hits. Utterance mode sends
+        whole parts, chunk mode sends chunks; results come back in job order.
+        """
+        if self.tts_workers <= 1:
+            return
 
-            if i % 5 == 0 or i == len(chunks):
-                print(f"🎵 Generated {i}/{len(chunks)} chunks...")
+        jobs, keys = [], []
+        for text in self.story_tts_texts(part_chunks):
+            key = self.tts_key(text)
+            if key in self._prefetched_keys:
+                continue
+            self._prefetched_keys.add(key)
+            if self.tts_cache.get(key) is not None:
+                continue
+            path = self.temp_path / f"tts_{len(jobs) + 1}_{datetime.now().strftime('%H%M%S_%f')}.wav"
+            temp_manager.register_temp_file(path)
+            jobs.append((text, path))
+            keys.append(key)
+        if len(jobs) <= 1:
+            return  # Nothing to parallelize - the in-process path handles it
+
+        print(f"🎵 Synthesizing {len(jobs)} utterances on {self.tts_workers} TTS workers...")
+        started = datetime.now()
+        for key, (path, duration) in zip(keys, self.get_tts_pool().synthesize(jobs)):
+            if duration is not None:
+                self.tts_cache.put(key, path, duration)
+        self.tts_cache.save()
+        print(f"✅ TTS pool done in {(datetime.now() - started).total_seconds():.1f}s")
 
-        engine.runAndWait()
+    def generate_tts_chunks_and_durations(self, chunks):
+        """Chunk audio + durations: served from the TTS cache (filled up front by the pool when
+        tts_workers > 1), anything still missing synthesized in-process"""
+        if self.tts_mode == "utterance":
+            return self.generate_tts_utterance_and_durations(chunks)
+
+        # Cached chunks skip synthesis entirely
+        keys = [self.tts_key(chunk) for chunk in chunks]
+        audio = [self.tts_cache.get(key, count=key not in self._prefetched_keys) for key in keys]
+        missing = [i for i, hit in enumerate(audio) if hit is None]
+
+        if missing:
+            engine = self.init_tts_engine()
+
+            # Generate TTS files
+            wavfiles = []
+            print(f"🎵 Generating TTS for {len(missing)}/{len(chunks)} chunks at {self.words_per_minute} WPM "
+                  f"({len(chunks) - len(missing)} cached)...")
+
+            for n, i in enumerate(missing, 1):
+                chunk_path = self.temp_path / f"tts_chunk_{i + 1}_{datetime.now().strftime('%H%M%S_%f')}.wav"
+                engine.save_to_file(chunks[i], str(chunk_path))
+                wavfiles.append(str(chunk_path))
+                temp_manager.register_temp_file(chunk_path)
+
+                if n % 5 == 0 or n == len(missing):
+                    print(f"🎵 Generated {n}/{len(missing)} chunks...")
+
+            engine.runAndWait()
+
+            # Durations come from the WAV headers - no ffmpeg reader per chunk
+            for i, wav in zip(missing, wavfiles):
+                duration = audio_duration(wav)
+                audio[i] = (self.tts_cache.put(keys[i], wav, duration), duration)
+        else:
+            print(f"🎵 All {len(chunks)} chunks served from the TTS cache")
+        self.tts_cache.save()
 
         # Generate timing
         timings = []
         t = 0.0
         total_audio_duration = 0
 
-        for chunk, wav in zip(chunks, wavfiles):
-            audio_clip = AudioFileClip(str(wav))
-            actual_audio_duration = audio_clip.duration
+        for chunk, (wav, actual_audio_duration) in zip(chunks, audio):
             text_duration = actual_audio_duration * self.text_duration_factor
 
             timings.append({
@@ -372,22 +595,90 @@ class FixedSequentialRedditVideoCreator:
 
             t += actual_audio_duration + self.text_transition_gap
             total_audio_duration += actual_audio_duration
-            audio_clip.close()
+            self.prediction_log.add_chunk(self.speech_model.predict(chunk), actual_audio_duration)
 
         print(f"✅ Total narration: {total_audio_duration:.1f}s")
         return timings
 
-    def create_overlay_clip(self, text, duration, start, color=None):
-        """Create text overlay clip using configurable settings"""
-        # Use default color if none specified
-        if color is None:
-            color = self.text_color
+    def generate_tts_utterance_and_durations(self, chunks):
+        """Synthesize the whole part as one utterance and locate each chunk inside it
+
+        One WAV per part instead of one per chunk. Chunk start / end times come from
+        the pauses in the PCM (see tts_timing), so captions line up with the audio
+        exactly and no gaps are added between chunks.
+        """
+        utterance = " ".join(chunks)
+        key = self.tts_key(utterance)
+        # Chunks are spans of one utterance: the intercept is paid once, on the first chunk
+        predicted = [self.speech_model.predict_span(chunk) for chunk in chunks]
+        if predicted:
+            predicted[0] += self.speech_model.intercept
+
+        cached = self.tts_cache.get(key, count=key not in self._prefetched_keys)
+        if cached:
+            wav_path = cached[0]
+            print(f"🎵 Part audio served from the TTS cache ({len(chunks)} chunks)")
+        else:
+            engine = self.init_tts_engine()
+            wav_path = self.temp_path / f"tts_part_{datetime.now().strftime('%H%M%S_%f')}.wav"
+            temp_manager.register_temp_file(wav_path)
 
-        display_text = textwrap.fill(text, width=self.wrap_chars_per_line)
-        adjusted_start = start + self.text_start_delay
-        adjusted_duration = max(0.1, duration)
+            print(f"🎵 Generating TTS for {len(chunks)} chunks as one utterance at {self.words_per_minute} WPM...")
+            engine.save_to_file(utterance, str(wav_path))
+            engine.runAndWait()
+
+        try:
+            spans = chunk_spans(wav_path, predicted)
+        except Exception as e:
+            print(f"❌ Could not read utterance audio: {e}")
+            return []
+
+        if not cached:
+            wav_path = self.tts_cache.put(key, wav_path, spans[-1][1])
+        self.tts_cache.save()
 
-        tc = TextClip(
+        timings = []
+        for chunk, prediction, (start, end) in zip(chunks, predicted, spans):
+            audio_duration = end - start
+            timings.append({
+                'chunk': chunk,
+                'audio_path': str(wav_path),
+                'start': start,
+                'text_duration': audio_duration * self.text_duration_factor,
+                'audio_duration': audio_duration
+            })
+            self.prediction_log.add_chunk(prediction, audio_duration)
+
+        print(f"✅ Total narration: {spans[-1][1]:.1f}s (1 file, {len(chunks)} chunks)")
+        return timings
+
+    def caption_window(self, start, duration):
+        """(start, duration) a caption is actually shown for"""
+        return start + self.text_start_delay, max(0.1, duration)
+
+    def caption_span(self, caption):
+        """(start, duration) of a timeline caption - word highlights tile their chunk exactly, no minimum"""
+        if caption.get('highlight') is not None:
+            return caption['start'] + self.text_start_delay, caption['duration']
+        return self.caption_window(caption['start'], caption['duration'])
+
+    def caption_rgba(self, text, color):
+        """Wrapped, stroked caption as an RGBA array from the configured caption renderer"""
+        display_text = textwrap.fill(text, width=self.wrap_chars_per_line)
+        if self.caption_renderer == "pillow":
+            return render_caption(display_text, self.default_font, self.fontsize_sentence, color,
+                                  self.text_stroke_color, self.text_stroke_width, self.textblock_width)
+
+        import numpy as np
+        tc = self.create_text_clip(display_text, color)
+        rgba = np.dstack([tc.get_frame(0), tc.mask.get_frame(0) * 255]).astype(np.uint8)
+        tc.close()
+        return rgba
+
+    def create_text_clip(self, display_text, color):
+        from moviepy.editor import TextClip
+        ensure_imagemagick()
+        return TextClip(
             txt=display_text,
             fontsize=self.fontsize_sentence,
             font=self.default_font,
@@ -397,12 +688,61 @@ class FixedSequentialRedditVideoCreator:
             method='caption',
             size=(self.textblock_width, None),
             align='center'
-        ).set_position(('center', 'center')) \
+        )
+
+    def create_overlay_clip(self, text, duration, start, color=None):
+        """Create text overlay clip using configurable settings"""
+        # Use default color if none specified
+        if color is None:
+            color = self.text_color
+
+        adjusted_start, adjusted_duration = self.caption_window(start, duration)
+
+        if self.caption_renderer == "pillow":
+            clip = caption_clip(self.caption_rgba(text, color))
+        else:
+            clip = self.create_text_clip(textwrap.fill(text, width=self.wrap_chars_per_line), color)
+        return clip.set_position(('center', 'center')) \
             .set_start(adjusted_start).set_duration(adjusted_duration)
-        return tc
 
-    def create_single_video_part(self, story_part, part_number, total_parts, story_index, story_title,
-                                 background_videos):
+    def caption_overlay_clip(self, caption):
+        """Overlay clip for a timeline caption - prerendered layers (karaoke) keep their own image and position"""
+        if 'rgba' not in caption:
+            return self.create_overlay_clip(caption['text'], duration=caption['duration'], start=caption['start'],
+                                            color=caption['color'])
+        start, duration = self.caption_span(caption)
+        return caption_clip(caption['rgba']).set_position(caption.get('position', ('center', 'center'))) \
+            .set_start(start).set_duration(duration)
+
+    def get_word_atlas(self):
+        if self._word_atlas is None:
+            self._word_atlas = WordAtlas(self.default_font, self.fontsize_sentence, self.text_stroke_color,
+                                         self.text_stroke_width)
+        return self._word_atlas
+
+    def karaoke_captions(self, caption):
+        """Chunk caption -> its base block plus one highlight sprite per word, timed from the speech model
+
+        Word times split the chunk's span in proportion to each word's predicted
+        speaking time; a highlight covers only its word's box on screen.
+        """
+        block, highlights = self.get_word_atlas().karaoke(
+            karaoke_wrap(caption['text'], self.wrap_chars_per_line), self.textblock_width,
+            caption['color'], self.karaoke_highlight_color)
+        origin_x = (VIDEO_WIDTH - block.shape[1]) // 2
+        origin_y = (VIDEO_HEIGHT - block.shape[0]) // 2
+
+        layers = [dict(caption, rgba=block, karaoke=True, position=(origin_x, origin_y))]
+        timings = word_timings(caption['text'], caption['start'], caption['duration'],
+                               self.speech_model.coefficients)
+        for i, ((_, start, duration), (sprite, x, y)) in enumerate(zip(timings, highlights)):
+            layers.append({"text": caption['text'], "start": start, "duration": duration,
+                           "color": self.karaoke_highlight_color, "style": caption['style'], "highlight": i,
+                           "rgba": sprite, "position": (origin_x + x, origin_y + y)})
+        return layers
+
+    def create_single_video_part(self, doc, part_range, part_number, total_parts, story_index, story_title,
+                                 background_videos, chunks=None):
         """Create single video part with cycling background videos"""
         print(f"\n🎬 Creating Story {story_index} - Part {part_number}/{total_parts}")
         print(f"{'=' * 60}")
@@ -410,53 +750,47 @@ class FixedSequentialRedditVideoCreator:
         # FIXED: Cycle through background videos for each video
         bg_video = self.cycle_background_video(background_videos)
 
-        print(f"📖 Part {part_number}/{total_parts}: {len(story_part.split())} words")
+        print(f"📖 Part {part_number}/{total_parts}: {doc.part_words(*part_range)} words")
 
-        chunks = self.split_and_sync_chunks(story_part)
+        if chunks is None:
+            chunks = self.split_and_sync_chunks(doc, *part_range)
+        chunk_gap = 0 if self.tts_mode == "utterance" else self.text_transition_gap
+        if self.tts_mode == "utterance":
+            predicted_duration = self.speech_model.predict_utterance(chunks)
+        else:
+            predicted_duration = sum(self.speech_model.predict(chunk) + chunk_gap for chunk in chunks)
+        if total_parts > 1:
+            predicted_duration += self.part_indicator_silence
         overlays_info = self.generate_tts_chunks_and_durations(chunks)
 
         if not overlays_info:
             print("❌ No overlays for this part")
             return None
 
-        # Load background video
-        bg_clip = VideoFileClip(str(bg_video))
-        bg_duration = bg_clip.duration
-
         # Calculate narration duration
         total_narration_duration = sum(t['audio_duration'] for t in overlays_info) + (
-                len(overlays_info) * self.text_transition_gap)
+                len(overlays_info) * chunk_gap)
         print(f"📊 Narration: {total_narration_duration:.1f}s")
 
-        # Loop background if needed
-        if bg_duration < total_narration_duration:
-            print(f"🔄 Looping background to cover {total_narration_duration:.1f}s")
-            bg_clip = bg_clip.loop(duration=total_narration_duration + 10)
-
-        # Resize to vertical format
-        bg_clip = bg_clip.resize(height=1920)
-        if bg_clip.w > 1080:
-            bg_clip = bg_clip.crop(x_center=bg_clip.w / 2, width=1080, height=1920)
-        else:
-            bg_clip = bg_clip.set_position('center').resize(width=1080)
-
-        # Create overlays
-        final_overlays = []
+        # Timeline shared by every render backend: captions with their times, then the audio track
+        captions = []
         audio_files_to_use = []
 
         # Add part indicator if multi-part
         if total_parts > 1:
-            part_indicator = f"Part {part_number} of {total_parts}"
-            part_overlay = self.create_overlay_clip(
-                part_indicator,
-                duration=self.part_indicator_duration,  # Now configurable
-                start=0,
-                color=self.part_indicator_color  # Now configurable
-            )
-            final_overlays.append(part_overlay)
+            captions.append({
+                "text": f"Part {part_number} of {total_parts}",
+                "start": 0,
+                "duration": self.part_indicator_duration,  # Now configurable
+                "color": self.part_indicator_color,  # Now configurable
+                "style": "Part",
+            })
 
         for i, t in enumerate(overlays_info):
-            audio_files_to_use.append(t['audio_path'])
+            # In utterance mode every chunk shares the part's single WAV; in chunk mode each chunk
+            # plays its own, even when repeated text resolves to the same cached file
+            if self.tts_mode != "utterance" or not audio_files_to_use:
+                audio_files_to_use.append(t['audio_path'])
 
             # Adjust start time for part indicator
             start_time = t['start']
@@ -465,34 +799,26 @@ class FixedSequentialRedditVideoCreator:
 
             print(f"🎯 Chunk {i + 1}: {start_time:.1f}s→{start_time + t['audio_duration']:.1f}s")
 
-            final_overlays.append(self.create_overlay_clip(
-                t['chunk'],
-                duration=t['text_duration'],
-                start=start_time,
-                color=self.text_color  # Now configurable
-            ))
+            captions.append({"text": t['chunk'], "start": start_time, "duration": t['text_duration'],
+                             "color": self.text_color, "style": "Caption"})
 
-        # Compose video
-        overlay_audio_clips = [AudioFileClip(f) for f in audio_files_to_use]
-        narration_clip = concatenate_audioclips(overlay_audio_clips)
+        if self.caption_mode == "karaoke":
+            captions = [layer for caption in captions
+                        for layer in (self.karaoke_captions(caption) if caption['style'] == "Caption" else [caption])]
 
-        # Handle part indicator audio
-        if total_parts > 1:
-            silence_duration = self.part_indicator_silence  # Now configurable
-            temp_silence_path = self.temp_path / f"silence_{story_index}_{part_number}_{datetime.now().strftime('%H%M%S_%f')}.wav"
-
-            silence_audio = AudioSegment.silent(duration=int(silence_duration * 1000))
-            silence_audio.export(str(temp_silence_path), format="wav")
-            temp_manager.register_temp_file(temp_silence_path)
-
-            silence_clip = AudioFileClip(str(temp_silence_path))
-            full_audio = concatenate_audioclips([silence_clip, narration_clip])
-            final_duration = full_audio.duration
-        else:
-            full_audio = narration_clip
-            final_duration = narration_clip.duration
+        # Compose audio: part indicator silence + narration (+ chunk gaps, so chunk-mode captions
+        # stay in sync) assembled into one contiguous track - the encoder sees a single source
+        segments = [("silence", self.part_indicator_silence)] if total_parts > 1 else []
+        for audio_path in audio_files_to_use:
+            segments.append(("audio", audio_path))
+            if chunk_gap:
+                segments.append(("silence", chunk_gap))
+        samples, sample_rate = assemble_narration(segments)
+        final_duration = len(samples) / sample_rate
 
         print(f"🎬 FINAL DURATION: {final_duration:.1f}s ({final_duration / 60:.1f}m)")
+        print(f"🎯 Predicted {predicted_duration:.1f}s ({predicted_duration - final_duration:+.1f}s)")
+        self.prediction_log.add_part(predicted_duration, final_duration)
 
         # Check if within 2-minute limit
         if final_duration > self.max_video_duration:
@@ -500,14 +826,132 @@ class FixedSequentialRedditVideoCreator:
         else:
             print(f"✅ Video within 2-minute limit")
 
-        all_clips = [bg_clip.set_duration(final_duration)] + final_overlays
-        final = CompositeVideoClip(all_clips).set_audio(full_audio)
-
         # Generate smart filename
         smart_filename = self.generate_smart_filename(story_title, story_index, part_number, total_parts)
         out_fn = self.output_path / f"{smart_filename}.mp4"
 
-        print(f"💾 Exporting: {smart_filename}.mp4")
+        backend = self.active_render_backend()
+        print(f"💾 Exporting: {smart_filename}.mp4 ({backend})")
+
+        subtitle_paths = {}
+        if self.export_subtitles or backend == "subtitles":
+            subtitle_paths = self.write_part_subtitles(captions, self.output_path / smart_filename)
+            print(f"📝 Subtitles: {', '.join(path.name for path in subtitle_paths.values())}")
+
+        if backend in ("ffmpeg", "subtitles"):
+            try:
+                self.render_part_ffmpeg(bg_video, captions, samples, sample_rate, final_duration, out_fn,
+                                        subtitle_paths.get("ass") if backend == "subtitles" else None)
+            except RuntimeError as e:
+                print(f"❌ Render failed: {e}")
+                return None
+        else:
+            self.render_part_moviepy(bg_video, captions, samples, sample_rate, final_duration, out_fn)
+
+        print(f"✅ COMPLETED: {smart_filename}.mp4 ({final_duration:.1f}s)")
+        return str(out_fn)
+
+    def active_render_backend(self):
+        """Configured backend - ffmpeg falls back to moviepy when no ffmpeg binary is found,
+        subtitle burn-in falls back to caption overlays when ffmpeg was built without libass"""
+        if self.render_backend in ("ffmpeg", "subtitles") and not get_tool_path("ffmpeg"):
+            print("⚠️ ffmpeg not found, rendering with moviepy")
+            self.render_backend = "moviepy"
+        if self.render_backend == "subtitles" and not has_filter("subtitles"):
+            print("⚠️ ffmpeg has no libass 'subtitles' filter, rendering caption overlays")
+            self.render_backend = "ffmpeg"
+        return self.render_backend
+
+    def subtitle_styles(self):
+        """ASS styles matching the rendered captions: body text and the part indicator"""
+        def style(name, color):
+            return ass_style(name, self.default_font, self.fontsize_sentence, color, self.text_stroke_color,
+                             self.text_stroke_width, self.textblock_width)
+        return {"Caption": style("Caption", self.text_color), "Part": style("Part", self.part_indicator_color),
+                "Highlight": style("Highlight", self.karaoke_highlight_color)}
+
+    def write_part_subtitles(self, captions, path_base):
+        events = []
+        for caption in captions:
+            start, duration = self.caption_span(caption)
+            events.append({"text": caption['text'], "start": start, "end": start + duration,
+                           "style": caption['style'], "karaoke": caption.get('karaoke'),
+                           "highlight": caption.get('highlight')})
+        return write_subtitles(events, self.subtitle_styles(), path_base, wrap_chars=self.wrap_chars_per_line)
+
+    def narration_wav(self, samples, sample_rate):
+        narration_path = self.temp_path / f"narration_{datetime.now().strftime('%H%M%S_%f')}.wav"
+        write_wav(narration_path, samples, sample_rate)
+        temp_manager.register_temp_file(narration_path)
+        return narration_path
+
+    def render_part_ffmpeg(self, bg_video, captions, samples, sample_rate, final_duration, out_fn, subtitles=None):
+        """One ffmpeg process: looped + cropped background, timed caption PNGs (or the ASS
+        file through libass), narration WAV
+
+        Karaoke blocks and word highlights are flattened into one concat track (a
+        frame per word), so they cost one input and one overlay, not one per word.
+        """
+        timeline, karaoke_layers = [], []
+        fonts_dir = None
+        if subtitles:
+            # libass draws every caption - point it at the same font file the Pillow renderer uses
+            font_file = find_font_file(self.default_font)
+            fonts_dir = Path(font_file).parent if font_file else None
+        else:
+            for caption in captions:
+                start, duration = self.caption_span(caption)
+                if caption.get('karaoke') or caption.get('highlight') is not None:
+                    x, y = caption['position']
+                    karaoke_layers.append({"rgba": caption['rgba'], "x": x, "y": y,
+                                           "start": start, "end": start + duration})
+                    continue
+                rgba = caption.get('rgba')
+                if rgba is None:
+                    rgba = self.caption_rgba(caption['text'], caption['color'])
+                image = caption_png(rgba, self.temp_path)
+                temp_manager.register_temp_file(image)
+                entry = {"image": image, "start": start, "end": start + duration}
+                if 'position' in caption:
+                    entry["x"], entry["y"] = caption['position']
+                timeline.append(entry)
+            if karaoke_layers:
+                track = caption_track(karaoke_layers, self.temp_path, name=f"{Path(out_fn).stem}_karaoke")
+                for path in [track["track"], *track["images"]]:
+                    temp_manager.register_temp_file(path)
+                timeline.insert(0, track)
+
+        render_part(bg_video, timeline, self.narration_wav(samples, sample_rate), final_duration,
+                    out_fn, self.temp_path, subtitles=subtitles, fonts_dir=fonts_dir)
+
+    def render_part_moviepy(self, bg_video, captions, samples, sample_rate, final_duration, out_fn):
+        """CompositeVideoClip of background + one overlay clip per caption"""
+        from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip
+
+        # Load background video
+        bg_clip = VideoFileClip(str(bg_video))
+
+        # Loop background if needed
+        if bg_clip.duration < final_duration:
+            print(f"🔄 Looping background to cover {final_duration:.1f}s")
+            bg_clip = bg_clip.loop(duration=final_duration + 10)
+
+        # Resize to vertical format
+        bg_clip = bg_clip.resize(height=1920)
+        if bg_clip.w > 1080:
+            bg_clip = bg_clip.crop(x_center=bg_clip.w / 2, width=1080, height=1920)
+        else:
+            bg_clip = bg_clip.set_position('center').resize(width=1080)
+
+        final_overlays = [self.caption_overlay_clip(caption) for caption in captions]
+
+        if self.narration_in_memory:
+            full_audio = narration_audio_clip(samples, sample_rate)
+        else:
+            full_audio = AudioFileClip(str(self.narration_wav(samples, sample_rate)))
+
+        all_clips = [bg_clip.set_duration(final_duration)] + final_overlays
+        final = CompositeVideoClip(all_clips).set_audio(full_audio)
 
         final.write_videofile(
             str(out_fn),
@@ -520,52 +964,60 @@ class FixedSequentialRedditVideoCreator:
 
         # Cleanup
         try:
-            if total_parts > 1:
-                full_audio.close()
-                silence_clip.close()
-
-            narration_clip.close()
-            for clip in overlay_audio_clips:
-                clip.close()
-                if os.path.exists(clip.filename):
-                    os.remove(clip.filename)
+            # Narration audio lives in the TTS cache - close the track, never delete the sources
+            full_audio.close()
             bg_clip.close()
             final.close()
         except Exception as e:
             print(f"⚠️ Cleanup warning: {e}")
 
-        print(f"✅ COMPLETED: {smart_filename}.mp4 ({final_duration:.1f}s)")
-        return str(out_fn)
-
     def create_story_videos(self, story, story_index, background_videos):
         """Create all video parts for a single story"""
         print(f"\n🎯 PROCESSING STORY {story_index}")
         print(f"{'=' * 80}")
 
+        # Narrate the normalized text - links, formatting and "I am not OOP" lines cost seconds
+        story = self.text_normalizer.normalize_story(story)
+
         title = story.get('title', '')[:120]
-        score = story.get('score', 0)
+        score = normalize_score(story.get('score', 0))
 
         print(f"📖 Story: {title[:50]}... (Score: {score:,})")
+        saved_chars = len(story.get('raw_full_story', story.get('full_story', ''))) - len(story.get('full_story', ''))
+        if saved_chars:
+            print(f"🧹 Normalized text: {saved_chars:,} chars of markdown / boilerplate removed")
 
         # Split story based on 2-minute limit
-        story_parts = self.split_story_for_2min_limit(story)
+        doc = self.build_story_document(story)
+        story_parts = self.split_story_for_2min_limit(doc)
         total_parts = len(story_parts)
+        if not story_parts:
+            print(f"⏭️ Story {story_index} skipped: too long for {self.max_videos_per_story} parts")
+            return []
 
         if total_parts > 1:
             print(f"📺 Creating {total_parts}-part series (2-min limit)")
         else:
             print(f"📺 Creating single video")
 
+        # Narration for every part is synthesized before the first render starts
+        part_chunks = [self.split_and_sync_chunks(doc, *part_range) for part_range in story_parts]
+
         created_videos = []
 
-        for part_num, story_part in enumerate(story_parts, 1):
-            result = self.create_single_video_part(story_part, part_num, total_parts, story_index, title,
-                                                   background_videos)
-            if result:
-                created_videos.append(result)
-                print(f"✅ Part {part_num}/{total_parts} completed")
-            else:
-                print(f"❌ Part {part_num}/{total_parts} failed")
+        # The story's audio stays pinned in the TTS cache until its last part is assembled,
+        # so evicting for a later chunk can't delete an earlier one still waiting to be used
+        with self.tts_cache.pinned([self.tts_key(text) for text in self.story_tts_texts(part_chunks)]):
+            self.prefetch_tts(part_chunks)
+
+            for part_num, (part_range, chunks) in enumerate(zip(story_parts, part_chunks), 1):
+                result = self.create_single_video_part(doc, part_range, part_num, total_parts, story_index, title,
+                                                       background_videos, chunks)
+                if result:
+                    created_videos.append(result)
+                    print(f"✅ Part {part_num}/{total_parts} completed")
+                else:
+                    print(f"❌ Part {part_num}/{total_parts} failed")
 
         print(f"🎉 Story {story_index} complete: {len(created_videos)}/{total_parts} parts")
         return created_videos
@@ -579,26 +1031,42 @@ class FixedSequentialRedditVideoCreator:
         print(f"🎮 Background cycling: ENABLED")
         print(f"{'=' * 80}")
 
-        stories = self.load_stories()
-        if not stories:
+        # Select and plan from the feature index - no story text is parsed here
+        entries = self.load_story_index()
+        if not entries:
             print("❌ No stories loaded!")
             return
 
         background_videos = self.get_background_videos()
 
+        # Rendering starts here - fail before any TTS work if ImageMagick is needed and missing
+        if self.caption_renderer == "imagemagick":
+            ensure_imagemagick()
+        self.speech_model = self.load_speech_model()
+
+        # Stories that can't fit in max_videos_per_story parts would only be skipped after reading them
+        candidates = [entry for entry in entries if self.plan_story(entry)[1] <= self.max_videos_per_story]
+        if len(candidates) < len(entries):
+            print(f"⏭️ Skipping {len(entries) - len(candidates)} stories too long for "
+                  f"{self.max_videos_per_story} parts")
+
         # STRICT LIMIT: Only 3 stories total
-        num_stories = min(len(stories), self.max_stories_total)
-        selected_stories = stories[:num_stories]
+        num_stories = min(len(candidates), self.max_stories_total)
+        selected_entries = candidates[:num_stories]
 
         print(f"📝 Processing EXACTLY {num_stories} stories (max: {self.max_stories_total})")
         print(f"🎮 Will cycle through {len(background_videos)} background videos")
 
         # Show selected stories
         print(f"\n📋 Selected stories:")
-        for i, story in enumerate(selected_stories, 1):
-            title = story.get('title', 'Unknown')[:60]
-            score = story.get('score', 0)
-            print(f"   {i}. {title}... (Score: {score:,})")
+        for i, entry in enumerate(selected_entries, 1):
+            title = (entry.get('title') or 'Unknown')[:60]
+            estimated_duration, parts = self.plan_story(entry)
+            print(f"   {i}. {title}... (Score: {entry['score']:,}) ~{estimated_duration:.0f}s, {parts} part(s)")
+
+        # Only the selected stories are read in full
+        selected_stories = [self.read_story(entry) for entry in selected_entries]
+        self.attach_top_comments(selected_stories)
 
         all_videos = []
         start_time = datetime.now()
@@ -608,6 +1076,10 @@ class FixedSequentialRedditVideoCreator:
             story_videos = self.create_story_videos(story, idx, background_videos)
             all_videos.extend(story_videos)
 
+        self.text_normalizer.save()
+        self.segmentation_cache.save()
+        self.close_tts_pool()
+
         end_time = datetime.now()
         creation_time = (end_time - start_time).total_seconds()
 
@@ -621,8 +1093,15 @@ class FixedSequentialRedditVideoCreator:
         print(f"⏱️  Time: {creation_time:.1f}s ({creation_time / 60:.1f}m)")
         print(f"📚 Stories processed: {len(selected_stories)}/{self.max_stories_total}")
         print(f"🎥 Total videos created: {len(all_videos)}")
+        self.prediction_log.report(self.speech_model)
+        self.tts_cache.report()
+        if self._word_atlas:
+            self._word_atlas.report()
+        print(f"🔎 Audio duration probes: {probe_stats['header']} from headers, "
+              f"{probe_stats['subprocess']} via ffmpeg, {probe_stats['memo']} memoized")
 
         if all_videos:
+            from moviepy.editor import VideoFileClip
             total_duration = 0
             for video_path in all_videos:
                 try:
@@ -655,7 +1134,10 @@ class FixedSequentialRedditVideoCreator:
         print(f"   • ✅ Stroke width: {self.text_stroke_width} (thicker)")
         print(f"   • ✅ Text color: {self.text_color}")
         print(f"   • ✅ Speech speed: {self.words_per_minute} WPM")
-        print(f"   • ✅ Dynamic ImageMagick detection")
+        print(f"   • ✅ Caption renderer: {self.caption_renderer}")
+        print(f"   • ✅ Render backend: {self.render_backend}")
+        print(f"   • ✅ Subtitle export: {'ASS + SRT' if self.export_subtitles else 'off'}")
+        print(f"   • ✅ Caption mode: {self.caption_mode}")
         print(f"   • ✅ Date-wise folders: {self.output_path.name}")
         print(f"   • ✅ Max stories: {self.max_stories_total}")
         print(f"   • ✅ Max video duration: {self.max_video_duration}s")
@@ -664,7 +1146,7 @@ class FixedSequentialRedditVideoCreator:
 def main():
     try:
         creator = FixedSequentialRedditVideoCreator(
-            stories_file="viral_stories_full.yaml",
+            stories_file="viral_stories_full.jsonl",
             background_videos_path="processed_backgrounds/",
             output_path="reddit_shorts/"
         )
@@ -0,0 +1,198 @@
+import hashlib
+import threading
+from array import array
+from pathlib import Path
+
+from json_files import load_json, atomic_write_json
+
+# --- Segmentation cache configuration ---
+SEGMENTATION_CACHE_FILE = "segmentation_cache.json"
+
+
+# --- StoryDocument: one segmentation pass per story, shared by every later stage ---
+class StoryDocument:
+    """Narration script with sentence offsets and word counts held in flat arrays
+
+    Sentence i is text[starts[i]:ends[i]]. The first title_sentences sentences
+    are the title (repeated at the start of every part). word_prefix[i] is the
+    word count of sentences [0, i), so any range's word count is O(1).
+    """
+
+    __slots__ = ("text", "title", "title_sentences", "starts", "ends", "words", "word_prefix", "content_hash")
+
+    def __init__(self, text, title, title_sentences, starts, ends, words, content_hash=None):
+        self.text = text
+        self.title = title
+        self.title_sentences = title_sentences
+        self.starts = array('I', starts)
+        self.ends = array('I', ends)
+        self.words = array('I', words)
+        self.word_prefix = array('I', [0])
+        total = 0
+        for count in self.words:
+            total += count
+            self.word_prefix.append(total)
+        self.content_hash = content_hash or script_hash(text)
+
+    @classmethod
+    def from_story(cls, story, tokenize, cache=None):
+        """Segment f"{title}. {full_story}" once (or load the segmentation from cache)"""
+        title = story.get('title', '')
+        content = story.get('full_story', '')
+        text = f"{title}. {content}"
+        key = script_hash(text)
+
+        cached = cache.get(key) if cache is not None else None
+        if cached:
+            return cls(cached.get("text", text), title, cached["title_sentences"],
+                       cached["starts"], cached["ends"], cached["words"], key)
+
+        title_part = [s.strip() for s in tokenize(f"{title}.") if s.strip()] if title else []
+        body = [s.strip() for s in tokenize(content) if s.strip()]
+        sentences = title_part + body
+
+        # Locate every sentence in the original text; fall back to a space-joined script if the
+        # tokenizer rewrote anything (offsets must always slice back to the exact sentence)
+        starts, ends, position = [], [], 0
+        for sentence in sentences:
+            start = text.find(sentence, position)
+            if start < 0:
+                break
+            starts.append(start)
+            ends.append(start + len(sentence))
+            position = start + len(sentence)
+        stored_text = None
+        if len(starts) != len(sentences):
+            text = stored_text = " ".join(sentences)
+            starts, ends, position = [], [], 0
+            for sentence in sentences:
+                starts.append(position)
+                ends.append(position + len(sentence))
+                position += len(sentence) + 1
+
+        words = [len(sentence.split()) for sentence in sentences]
+        document = cls(text, title, len(title_part), starts, ends, words, key)
+        if cache is not None:
+            cache.put(key, document, stored_text)
+        return document
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def body_range(self):
+        return self.title_sentences, len(self.starts)
+
+    @property
+    def total_words(self):
+        return self.word_prefix[-1]
+
+    def sentence(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def word_count(self, start=0, end=None):
+        end = len(self.starts) if end is None else end
+        return self.word_prefix[end] - self.word_prefix[start]
+
+    def part_sentences(self, start, end):
+        """Sentence indices narrated in a part: the title, then body sentences [start, end)"""
+        return list(range(self.title_sentences)) + list(range(start, end))
+
+    def part_words(self, start, end):
+        return self.word_count(0, self.title_sentences) + self.word_count(start, end)
+
+
+def script_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+# --- On-disk segmentation cache, keyed by script content hash ---
+class SegmentationCache:
+    """Sentence offsets / word counts per script, so a story is only tokenized once, ever"""
+
+    def __init__(self, path=SEGMENTATION_CACHE_FILE):
+        self.path = Path(path) if path else None
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        self.entries = load_json(self.path, {}, "segmentation cache")
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            atomic_write_json(self.path, self.entries, ensure_ascii=False)
+            self._dirty = False
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, key, document, stored_text=None):
+        entry = {
+            "title_sentences": document.title_sentences,
+            "starts": document.starts.tolist(),
+            "ends": document.ends.tolist(),
+            "words": document.words.tolist(),
+        }
+        if stored_text is not None:
+            entry["text"] = stored_text
+        with self._lock:
+            self.entries[key] = entry
+            self._dirty = True
+
+
+# --- Part planning: optimal linear partition of sentence durations ---
+def linear_partition(costs, parts):
+    """Split costs into `parts` contiguous non-empty runs minimizing the largest run total
+
+    Returns ([(start, end), ...], largest run total). Exact dynamic program; the
+    best split point only moves forward as a run grows, so each level is one
+    linear sweep - O(parts * n) overall.
+    """
+    n = len(costs)
+    parts = max(1, min(parts, n))
+    if n == 0:
+        return [(0, 0)], 0.0
+
+    prefix = [0.0]
+    for cost in costs:
+        prefix.append(prefix[-1] + cost)
+
+    # best[j][i] = smallest possible largest run when costs[:i] is split into j runs
+    inf = float('inf')
+    best = [[inf] * (n + 1) for _ in range(parts + 1)]
+    cut = [[0] * (n + 1) for _ in range(parts + 1)]
+    best[0][0] = 0.0
+    for j in range(1, parts + 1):
+        previous, current, cuts = best[j - 1], best[j], cut[j]
+        p = j - 1
+        for i in range(j, n + 1):
+            # previous[p] grows with p while the last run (p, i] shrinks: advance to the crossing
+            while p + 1 < i and previous[p + 1] < prefix[i] - prefix[p + 1]:
+                p += 1
+            for q in (p, p + 1):
+                if q < i:
+                    value = max(previous[q], prefix[i] - prefix[q])
+                    if value < current[i]:
+                        current[i], cuts[i] = value, q
+
+    bounds, end = [], n
+    for j in range(parts, 0, -1):
+        start = cut[j][end]
+        bounds.append((start, end))
+        end = start
+    bounds.reverse()
+    return bounds, best[parts][n]
@@ -0,0 +1,532 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+import yaml
+
+from text_normalizer import normalize_text
+
+# --- Planning defaults used for the precomputed feature index ---
+WORDS_PER_MINUTE = 230
+MAX_VIDEO_DURATION = 120
+
+STORY_DB_SUFFIXES = (".db", ".sqlite")
+
+_SENTENCE_END_RE = re.compile(r'[.!?]+(?:["\')\]]*)(?:\s+|$)')
+
+
+# --- Append-only JSON Lines story sink ---
+class JsonlStorySink:
+    """Writes each story to disk the moment it is accepted - a crash loses nothing already fetched
+
+    Every record also gets a line in the sidecar feature index (<name>.index.jsonl)
+    holding its byte offset, so readers can plan without parsing story bodies.
+    """
+
+    def __init__(self, path, write_index=True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.written = 0
+
+        repair_torn_tail(self.path)
+        self._index = None
+        if write_index:
+            index_path = story_index_path(self.path)
+            if self.path.exists():
+                # A crash between a story append and its index line leaves the index behind
+                if not story_index_is_current(self.path, index_path):
+                    build_story_index(self.path)
+            else:
+                index_path.unlink(missing_ok=True)
+            self._index = open(index_path, 'ab')
+
+        # Binary append so tell() gives real byte offsets for the index
+        self._file = open(self.path, 'ab')
+
+    def _append(self, handle, record):
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        offset = handle.tell()
+        handle.write(data)
+        handle.flush()
+        return [offset, len(data)]
+
+    def write(self, story):
+        features = story_features(story) if self._index else None
+        with self._lock:
+            location = self._append(self._file, story)
+            if self._index:
+                features["records"] = [location]
+                self._append(self._index, features)
+            self.written += 1
+
+    def write_patch(self, story, fields):
+        """Append a partial record - readers merge it into the stored story by key"""
+        patch = {"permalink": story_key(story)}
+        patch.update({field: story[field] for field in fields if field in story})
+        with self._lock:
+            location = self._append(self._file, patch)
+            if self._index:
+                self._append(self._index, index_patch(patch, location))
+            self.written += 1
+
+    def close(self):
+        with self._lock:
+            for handle in (self._file, self._index):
+                if handle and not handle.closed:
+                    handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def repair_torn_tail(path):
+    """Cut a half-written last line left by a crash so the next append starts on a fresh line
+
+    A last line that still parses (just missing its newline) is kept and terminated instead.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, 'r+b') as f:
+        size = f.seek(0, 2)
+        if not size:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        line_start = _line_start(f, size)
+        f.seek(line_start)
+        if _parse_jsonl_line(f.read()) is not None:
+            f.write(b"\n")
+            return
+        f.truncate(line_start)
+    print(f"⚠️ Dropped a torn last line ({size - line_start} bytes) from {path}")
+
+
+def _line_start(f, end):
+    """Offset just past the last newline before `end` (0 if there is none) - walks back in blocks"""
+    start = end
+    while start > 0:
+        step = min(4096, start)
+        start -= step
+        f.seek(start)
+        newline = f.read(step).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+    return 0
+
+
+def story_key(story):
+    return story.get('permalink') or story.get('url')
+
+
+# --- Per-story features for the sidecar index ---
+def normalize_score(score):
+    """Scores may arrive as strings like '1,234' or '5k'"""
+    if isinstance(score, str):
+        try:
+            return int(score.replace(',', '').replace('k', '000').replace('K', '000'))
+        except ValueError:
+            return 0
+    return score or 0
+
+
+def content_hash(story):
+    text = f"{story.get('title', '')}\n{story.get('full_story', '')}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def story_features(story, words_per_minute=WORDS_PER_MINUTE):
+    """Everything the video creator needs to select and plan a story, minus the text
+
+    Counts are taken on the normalized narration text (no markdown or repost
+    boilerplate), which is what actually gets spoken.
+    """
+    title = story.get('title', '')
+    content = normalize_text(story.get('full_story', ''))
+    word_count = len(f"{title}. {content}".split())
+    estimated_seconds = (word_count * 60) / words_per_minute
+    return {
+        "key": story_key(story),
+        "title": title,
+        "subreddit": story.get('subreddit'),
+        "score": normalize_score(story.get('score', 0)),
+        "word_count": word_count,
+        "sentence_count": sum(1 for s in _SENTENCE_END_RE.split(content) if s.strip()),
+        "est_seconds": round(estimated_seconds, 1),
+        "content_hash": content_hash(story),
+        "duplicate_of": story.get('duplicate_of'),
+    }
+
+
+def index_patch(patch, location):
+    entry = {"key": story_key(patch), "records": [location]}
+    if 'score' in patch:
+        entry["score"] = normalize_score(patch['score'])
+    return entry
+
+
+def story_index_path(stories_path):
+    """viral_stories_full.jsonl -> viral_stories_full.index.jsonl"""
+    return Path(stories_path).with_suffix(".index.jsonl")
+
+
+def build_story_index(stories_path):
+    """(Re)build the sidecar index with one scan of an existing JSONL corpus"""
+    stories_path = Path(stories_path)
+    index_path = story_index_path(stories_path)
+    entries = 0
+    with open(index_path, 'wb') as dst:
+        for location, record in iter_jsonl_lines(stories_path):
+            entry = story_features(record) if 'full_story' in record else index_patch(record, location)
+            entry["records"] = [location]
+            dst.write((json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8'))
+            entries += 1
+    print(f"🗂️ Built story index: {index_path} ({entries} records)")
+    return index_path
+
+
+def story_index_is_current(stories_path, index_path=None):
+    """Whether the sidecar index covers every complete record of the corpus
+
+    Only the two file tails are read: the last index line holds the highest
+    indexed byte offset, and past it the corpus may hold at most a torn line.
+    """
+    stories_path = Path(stories_path)
+    index_path = Path(index_path) if index_path else story_index_path(stories_path)
+    if not index_path.exists():
+        return False
+
+    indexed_end = 0
+    index_size = index_path.stat().st_size
+    if index_size:
+        with open(index_path, 'rb') as f:
+            last_start = _line_start(f, index_size - 1)
+            f.seek(last_start)
+            last = _parse_jsonl_line(f.read())
+        if last is None:
+            return False
+        indexed_end = max(offset + length for offset, length in last.get("records", [[0, 0]]))
+
+    corpus_size = stories_path.stat().st_size
+    if indexed_end > corpus_size:
+        return False
+    with open(stories_path, 'rb') as f:
+        f.seek(indexed_end)
+        while True:
+            block = f.read(65536)
+            if not block:
+                return True
+            if b"\n" in block:
+                return False
+
+
+def read_story_index(index_path):
+    """Merge index lines into one feature entry per story"""
+    entries = {}
+    for record in iter_jsonl_records(index_path):
+        key = record.get('key')
+        if 'content_hash' in record:
+            entries[key] = record
+        elif key in entries:
+            records = record.pop('records', [])
+            entries[key].update(record)
+            entries[key]['records'] = entries[key]['records'] + records
+    return list(entries.values())
+
+
+def read_story_records(stories_path, records):
+    """Read just the lines of one story (full record + patches) by byte offset"""
+    story = {}
+    with open(stories_path, 'rb') as f:
+        for offset, length in records:
+            f.seek(offset)
+            story.update(json.loads(f.read(length)))
+    return story
+
+
+# --- SQLite corpus with full-text search ---
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    full_story TEXT NOT NULL,
+    subreddit TEXT,
+    score INTEGER NOT NULL DEFAULT 0,
+    num_comments INTEGER NOT NULL DEFAULT 0,
+    created_utc REAL,
+    word_count INTEGER NOT NULL,
+    sentence_count INTEGER NOT NULL,
+    est_seconds REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    duplicate_of TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stories_score ON stories(score DESC);
+CREATE INDEX IF NOT EXISTS idx_stories_subreddit ON stories(subreddit, score DESC);
+CREATE INDEX IF NOT EXISTS idx_stories_words ON stories(word_count);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(
+    title, full_story, content='stories', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS stories_ai AFTER INSERT ON stories BEGIN
+    INSERT INTO stories_fts(rowid, title, full_story) VALUES (new.rowid, new.title, new.full_story);
+END;
+CREATE TRIGGER IF NOT EXISTS stories_ad AFTER DELETE ON stories BEGIN
+    INSERT INTO stories_fts(stories_fts, rowid, title, full_story)
+    VALUES ('delete', old.rowid, old.title, old.full_story);
+END;
+CREATE TRIGGER IF NOT EXISTS stories_au AFTER UPDATE OF title, full_story ON stories BEGIN
+    INSERT INTO stories_fts(stories_fts, rowid, title, full_story)
+    VALUES ('delete', old.rowid, old.title, old.full_story);
+    INSERT INTO stories_fts(rowid, title, full_story) VALUES (new.rowid, new.title, new.full_story);
+END;
+"""
+
+_FEATURE_COLUMNS = ("key", "title", "subreddit", "score", "word_count", "sentence_count",
+                    "est_seconds", "content_hash", "duplicate_of")
+
+
+def fts_query(text):
+    """User text as an FTS5 query: every term a quoted string, all of them required
+
+    Quoting keeps apostrophes, quotes and words like NOT / OR from being read as
+    FTS5 syntax, so any input is a valid query.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+
+class SqliteStoryStore:
+    """Story corpus in SQLite with an FTS5 index on title + body, for query-based selection
+
+    Same write / write_patch / close API as JsonlStorySink, so the fetcher can stream into it.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def write(self, story):
+        features = story_features(story)
+        data = {k: v for k, v in story.items() if k not in ("title", "full_story")}
+        row = (features["key"], features["title"], story.get('full_story', ''), features["subreddit"],
+               features["score"], story.get('num_comments', 0), story.get('created_utc'),
+               features["word_count"], features["sentence_count"], features["est_seconds"],
+               features["content_hash"], features["duplicate_of"], json.dumps(data, ensure_ascii=False))
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO stories (key, title, full_story, subreddit, score, num_comments, created_utc,
+                                     word_count, sentence_count, est_seconds, content_hash, duplicate_of, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    title=excluded.title, full_story=excluded.full_story, subreddit=excluded.subreddit,
+                    score=excluded.score, num_comments=excluded.num_comments, created_utc=excluded.created_utc,
+                    word_count=excluded.word_count, sentence_count=excluded.sentence_count,
+                    est_seconds=excluded.est_seconds, content_hash=excluded.content_hash,
+                    duplicate_of=excluded.duplicate_of, data=excluded.data
+            """, row)
+            self.written += 1
+
+    def write_patch(self, story, fields):
+        """Update selected fields of a stored story in place"""
+        key = story_key(story)
+        patch = {field: story[field] for field in fields if field in story}
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data, score, num_comments FROM stories WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is None:
+                return
+            data = json.loads(row["data"])
+            data.update(patch)
+            self._conn.execute(
+                "UPDATE stories SET data = ?, score = ?, num_comments = ? WHERE key = ?",
+                (json.dumps(data, ensure_ascii=False), normalize_score(data.get('score', row["score"])),
+                 data.get('num_comments', row["num_comments"]), key))
+            self.written += 1
+
+    @staticmethod
+    def _story_from_row(row):
+        story = {"title": row["title"], "full_story": row["full_story"]}
+        story.update(json.loads(row["data"]))
+        return story
+
+    def _select(self, columns, text=None, min_score=None, max_seconds=None, words_per_minute=WORDS_PER_MINUTE,
+                subreddits=None, include_duplicates=False, limit=None):
+        sql = f"SELECT {', '.join('s.' + c for c in columns)} FROM stories s"
+        where, params = [], []
+        if text and text.split():
+            sql += " JOIN stories_fts ON stories_fts.rowid = s.rowid"
+            where.append("stories_fts MATCH ?")
+            params.append(fts_query(text))
+        if min_score is not None:
+            where.append("s.score >= ?")
+            params.append(min_score)
+        if max_seconds is not None:
+            # Indexed word count instead of est_seconds, so any narration speed works
+            where.append("s.word_count <= ?")
+            params.append(int(max_seconds * words_per_minute / 60))
+        if subreddits:
+            where.append(f"s.subreddit IN ({', '.join('?' for _ in subreddits)})")
+            params.extend(subreddits)
+        if not include_duplicates:
+            where.append("s.duplicate_of IS NULL")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY s.score DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def select_features(self, **query):
+        """Index-style feature rows (no story text) matching the query, best score first"""
+        return [dict(row) for row in self._select(_FEATURE_COLUMNS, **query)]
+
+    def query(self, **query):
+        """Full stories matching the query, best score first
+
+        e.g. query(text="marriage", max_seconds=90, min_score=500, subreddits=["Arrangedmarriage"])
+        """
+        rows = self._select(("title", "full_story", "data"), **query)
+        return [self._story_from_row(row) for row in rows]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT title, full_story, data FROM stories WHERE key = ?",
+                                     (key,)).fetchone()
+        return self._story_from_row(row) if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_story_sink(path):
+    """Streaming story sink for a corpus path: SQLite for .db/.sqlite, JSONL otherwise"""
+    if Path(path).suffix in STORY_DB_SUFFIXES:
+        return SqliteStoryStore(path)
+    return JsonlStorySink(path)
+
+
+# --- Streaming readers ---
+def _parse_jsonl_line(line):
+    """One JSONL record as a dict, or None for a blank, torn or otherwise unreadable line"""
+    if not line.strip():
+        return None
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def iter_jsonl_lines(path):
+    """Yield ([byte offset, length], record) per readable line (a torn line from a crash is skipped)"""
+    with open(path, 'rb') as f:
+        offset = 0
+        for line_no, line in enumerate(f, 1):
+            location = [offset, len(line)]
+            offset += len(line)
+            record = _parse_jsonl_line(line)
+            if record is not None:
+                yield location, record
+            elif line.strip():
+                print(f"⚠️ Skipping unreadable line {line_no} in {path}")
+
+
+def iter_jsonl_records(path):
+    """Yield raw records line by line (a torn last line from a crash is skipped)"""
+    for _, record in iter_jsonl_lines(path):
+        yield record
+
+
+def iter_jsonl_stories(path):
+    """Stream stories from a JSONL log, applying patch records to the story they belong to"""
+    stories = {}
+    for record in iter_jsonl_records(path):
+        key = story_key(record)
+        if 'full_story' in record:
+            stories[key] = record
+        elif key in stories:
+            stories[key].update(record)
+    return iter(stories.values())
+
+
+def load_stories_file(path, **query):
+    """Load a story corpus from .jsonl, .json, .yaml or an SQLite .db (optionally filtered by query)"""
+    path = Path(path)
+    if not path.exists():
+        return []
+    if path.suffix in STORY_DB_SUFFIXES:
+        query.setdefault("include_duplicates", True)
+        with SqliteStoryStore(path) as store:
+            return store.query(**query)
+    if path.suffix == ".jsonl":
+        return list(iter_jsonl_stories(path))
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix == ".json":
+            return json.load(f) or []
+        if path.suffix in (".yaml", ".yml"):
+            return yaml.safe_load(f) or []
+    raise ValueError(f"Story file suffix not recognized: {path}")
+
+
+# --- Conversion ---
+LEGACY_SUFFIXES = (".yaml", ".yml", ".json")
+
+
+def migrate_legacy_corpus(jsonl_path):
+    """Create a missing JSONL corpus from its .yaml / .json sibling (the old full-rewrite formats)
+
+    The stories are written to a temp file and renamed into place, so an
+    interrupted import is simply redone next time. Returns the stories imported.
+    """
+    jsonl_path = Path(jsonl_path)
+    if jsonl_path.exists():
+        return 0
+    for suffix in LEGACY_SUFFIXES:
+        legacy_path = jsonl_path.with_suffix(suffix)
+        if not legacy_path.exists():
+            continue
+        stories = load_stories_file(legacy_path)
+        tmp_path = Path(f"{jsonl_path}.tmp")
+        with JsonlStorySink(tmp_path, write_index=False) as sink:
+            for story in stories:
+                sink.write(story)
+        tmp_path.replace(jsonl_path)
+        print(f"📦 Imported {len(stories)} stories from {legacy_path} into {jsonl_path}")
+        return len(stories)
+    return 0
+
+
+
+def convert_jsonl_to_yaml(jsonl_path, yaml_path=None):
+    """Export a JSONL corpus as the old score-sorted YAML file"""
+    jsonl_path = Path(jsonl_path)
+    yaml_path = Path(yaml_path) if yaml_path else jsonl_path.with_suffix(".yaml")
+    stories = sorted(iter_jsonl_stories(jsonl_path), key=lambda s: s.get('score', 0), reverse=True)
+    with open(yaml_path, 'w', encoding='utf-8') as f:
+        yaml.dump(stories, f, allow_unicode=True, sort_keys=False,
+                  default_flow_style=False, indent=2)
+    print(f"✅ {len(stories)} stories exported as YAML: {yaml_path}")
+    return yaml_path
@@ -0,0 +1,88 @@
+import math
+import threading
+import time
+from pathlib import Path
+
+from json_files import load_json, atomic_write_json
+
+# --- Scheduler configuration ---
+YIELD_STATS_FILE = "subreddit_yield_stats.json"
+PRIOR_ACCEPTED = 1  # Prior of 1 accepted per 2 scanned = the old fixed limit_per_sub * 2 listing
+PRIOR_SCANNED = 2
+DEPTH_SAFETY = 1.25  # Once a sub has history, list a bit deeper than its expected yield strictly needs
+MAX_LISTING_DEPTH = 100  # One listing page - going deeper costs an extra request
+SKIP_AFTER_EMPTY_RUNS = 3  # Start backing off after this many runs in a row with nothing accepted
+MAX_BACKOFF_RUNS = 16  # A dead subreddit is still polled at least every 16 runs
+
+
+class SubredditScheduler:
+    """Plans listing depth per subreddit from yield history persisted across runs"""
+
+    def __init__(self, path=YIELD_STATS_FILE):
+        self.path = Path(path)
+        self.stats = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        self.stats = load_json(self.path, {}, "yield stats")
+        print(f"📈 Yield history for {len(self.stats)} subreddit listings")
+
+    def save(self):
+        with self._lock:
+            atomic_write_json(self.path, self.stats, indent=2)
+
+    @staticmethod
+    def _key(sub, sort, timeframe, mode="listing"):
+        # Yield depends on the listing too (top/week vs top/month, listing vs search)
+        if mode == "search":
+            return f"{sub}|search:{sort}/{timeframe}"
+        return f"{sub}|{sort}/{timeframe}"
+
+    def _entry(self, key):
+        return self.stats.setdefault(key, {
+            "runs": 0, "scanned": 0, "accepted": 0,
+            "empty_streak": 0, "skipped_since_poll": 0, "last_polled": None
+        })
+
+    def expected_yield(self, sub, sort="top", timeframe="week", mode="listing"):
+        entry = self.stats.get(self._key(sub, sort, timeframe, mode), {})
+        return ((entry.get("accepted", 0) + PRIOR_ACCEPTED) /
+                (entry.get("scanned", 0) + PRIOR_SCANNED))
+
+    def _backoff_runs(self, empty_streak):
+        if empty_streak < SKIP_AFTER_EMPTY_RUNS:
+            return 0
+        return min(2 ** (empty_streak - SKIP_AFTER_EMPTY_RUNS + 1), MAX_BACKOFF_RUNS) - 1
+
+    def plan(self, subreddits, sort, timeframe, limit_per_sub, mode="listing"):
+        """Listing depth per subreddit for this run (0 = skip this run)"""
+        plan = {}
+        with self._lock:
+            for sub in subreddits:
+                entry = self._entry(self._key(sub, sort, timeframe, mode))
+
+                # Subs that keep yielding nothing are polled exponentially less often
+                if entry["skipped_since_poll"] < self._backoff_runs(entry["empty_streak"]):
+                    entry["skipped_since_poll"] += 1
+                    plan[sub] = 0
+                    continue
+
+                # No observations yet: the prior alone gives exactly the old limit_per_sub * 2 depth
+                expected = self.expected_yield(sub, sort, timeframe, mode)
+                safety = DEPTH_SAFETY if entry["scanned"] else 1.0
+                depth = math.ceil(limit_per_sub / expected * safety)
+                plan[sub] = max(limit_per_sub, min(depth, max(MAX_LISTING_DEPTH, limit_per_sub * 2)))
+        return plan
+
+    def record(self, sub, sort, timeframe, scanned, accepted, mode="listing"):
+        with self._lock:
+            entry = self._entry(self._key(sub, sort, timeframe, mode))
+            entry["runs"] += 1
+            entry["scanned"] += scanned
+            entry["accepted"] += accepted
+            entry["empty_streak"] = 0 if accepted else entry["empty_streak"] + 1
+            entry["skipped_since_poll"] = 0
+            entry["last_polled"] = time.time()
@@ -0,0 +1,116 @@
+import textwrap
+from pathlib import Path
+
+# --- Subtitle export: the caption timeline as ASS (styled) and SRT (plain) ---
+PLAY_RES = (1080, 1920)
+ASS_EVENT_FORMAT = "Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+ASS_STYLE_FORMAT = ("Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+                    "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, "
+                    "Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding")
+
+
+def ass_color(color):
+    """'white' / '#00ffff' / (r, g, b) -> ASS &HAABBGGRR (opaque)"""
+    if isinstance(color, str):
+        from PIL import ImageColor
+        color = ImageColor.getrgb(color)
+    r, g, b = color[:3]
+    return f"&H00{b:02X}{g:02X}{r:02X}"
+
+
+def ass_timestamp(seconds):
+    centis = int(round(max(0.0, seconds) * 100))
+    hours, centis = divmod(centis, 360000)
+    minutes, centis = divmod(centis, 6000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def srt_timestamp(seconds):
+    millis = int(round(max(0.0, seconds) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def ass_text(text, wrap_chars, highlight=None):
+    """Caption text wrapped like the rendered captions, with ASS override syntax neutralized
+
+    highlight: index of a word (in text.split()) drawn in the "Highlight" style.
+    """
+    text = text.replace("{", "(").replace("}", ")").replace("\\", "\\⁠")
+    if wrap_chars:
+        lines = textwrap.wrap(text, width=wrap_chars, break_long_words=False, break_on_hyphens=False)
+    else:
+        lines = [text]
+    if highlight is not None:
+        index, marked = 0, []
+        for line in lines:
+            words = line.split()
+            for j, word in enumerate(words):
+                if index == highlight:
+                    words[j] = f"{{\\rHighlight}}{word}{{\\r}}"
+                index += 1
+            marked.append(" ".join(words))
+        lines = marked
+    return r"\N".join(lines)
+
+
+def ass_style(name, font, fontsize, color, outline_color, outline, block_width, play_res=PLAY_RES):
+    """One ASS style line: centered on screen, wrapped inside a block_width wide column"""
+    margin = max(0, (play_res[0] - block_width) // 2)
+    fields = [name, font, fontsize, ass_color(color), ass_color(color), ass_color(outline_color),
+              "&H00000000", 0, 0, 0, 0, 100, 100, 0, 0, 1, outline, 0, 5, margin, margin, 0, 1]
+    return "Style: " + ",".join(str(field) for field in fields)
+
+
+def build_ass(events, styles, wrap_chars=None, play_res=PLAY_RES):
+    """ASS document from [{"text", "start", "end", "style"}, ...] and {style name: ass_style line}
+
+    Karaoke captions come as a base event ("karaoke") plus one event per word
+    ("highlight": word index) tiling the same span - only the word events are
+    written, each one the whole chunk with that word in the "Highlight" style.
+    """
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {play_res[0]}",
+        f"PlayResY: {play_res[1]}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        f"Format: {ASS_STYLE_FORMAT}",
+        *styles.values(),
+        "",
+        "[Events]",
+        f"Format: {ASS_EVENT_FORMAT}",
+    ]
+    for event in events:
+        if event.get('karaoke'):
+            continue
+        text = ass_text(event['text'], wrap_chars, event.get('highlight'))
+        lines.append(f"Dialogue: 0,{ass_timestamp(event['start'])},{ass_timestamp(event['end'])},"
+                     f"{event['style']},,0,0,0,,{text}")
+    return "\n".join(lines) + "\n"
+
+
+def build_srt(events):
+    """SRT document from the same events - no styling, for soft captions on upload"""
+    blocks = []
+    for i, event in enumerate((e for e in events if e.get('highlight') is None), 1):
+        blocks.append(f"{i}\n{srt_timestamp(event['start'])} --> {srt_timestamp(event['end'])}\n"
+                      f"{event['text'].strip()}\n")
+    return "\n".join(blocks)
+
+
+def write_subtitles(events, styles, path_base, wrap_chars=None, formats=("ass", "srt")):
+    """Write <path_base>.ass / .srt and return {format: path}"""
+    builders = {"ass": lambda: build_ass(events, styles, wrap_chars), "srt": lambda: build_srt(events)}
+    paths = {}
+    for fmt in formats:
+        path = Path(f"{path_base}.{fmt}")
+        path.write_text(builders[fmt](), encoding='utf-8')
+        paths[fmt] = path
+    return paths
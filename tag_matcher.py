@@ -0,0 +1,140 @@
+import re
+from functools import lru_cache
+
+
+# --- Trie-shaped regex: one branch per character instead of one alternative per tag ---
+def _trie_pattern(node):
+    terminal = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if not terminal:
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    # Optional suffix is greedy, so the longest tag at a position wins
+    if len(branches) == 1 and len(branches[0]) == 1:
+        return f"{branches[0]}?"
+    return f"(?:{'|'.join(branches)})?"
+
+
+def build_tag_pattern(tags):
+    """Compile tags into a regex trie, e.g. relationship(?:advice|s)?"""
+    trie = {}
+    for tag in tags:
+        node = trie
+        for char in tag:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_pattern(trie)
+
+
+# --- Compiled multi-pattern matcher for title filtering ---
+MAX_RESOLVED_HITS = 4096  # Memoized hit sequences per matcher before the memo is reset
+
+class TagMatcher:
+    """Matches every tag against a title in a single compiled regex (trie automaton) pass"""
+
+    def __init__(self, tags):
+        # Lowercase + dedupe while keeping the caller's tag order
+        self.tags = list(dict.fromkeys(tag.lower() for tag in tags if tag))
+
+        alternation = build_tag_pattern(self.tags)
+        self._any_tag = re.compile(alternation) if self.tags else None
+
+        # A hit on one tag also means every tag contained in it matched at that position
+        self._implied = {
+            tag: [other for other in self.tags if other in tag]  # Already in tag-list order
+            for tag in self.tags
+        }
+        # Where to look for the next hit: the first offset inside the tag where another tag
+        # could start and run past its end (usually none - skip the whole hit)
+        self._resume = {tag: self._first_overlap(tag) for tag in self.tags}
+        self._order = {tag: i for i, tag in enumerate(self.tags)}
+        self._resolved = {}  # Hit sequence -> matched tags, in tag-list order
+
+    def _first_overlap(self, tag):
+        for offset in range(1, len(tag)):
+            suffix = tag[offset:]
+            if any(other.startswith(suffix) and len(other) > len(suffix) for other in self.tags):
+                return offset
+        return len(tag)
+
+    def is_match(self, title_lower):
+        """True if any tag occurs in the (already lowercased) title"""
+        return self._any_tag is not None and self._any_tag.search(title_lower) is not None
+
+    def matches(self, title_lower):
+        """All tags occurring in the (already lowercased) title, in tag-list order
+
+        One left-to-right scan of longest hits; tags inside a hit come from the
+        precomputed containment map, and each distinct hit sequence is resolved
+        to its ordered tag list only once.
+        """
+        if self._any_tag is None:
+            return []
+        search = self._any_tag.search
+        resume = self._resume
+        hits = []
+        hit = search(title_lower)
+        while hit is not None:
+            tag = hit.group()
+            hits.append(tag)
+            hit = search(title_lower, hit.start() + resume[tag])
+        if not hits:
+            return []
+
+        key = tuple(hits)
+        result = self._resolved.get(key)
+        if result is None:
+            found = set()
+            for tag in hits:
+                found.update(self._implied[tag])
+            result = sorted(found, key=self._order.__getitem__)
+            if len(self._resolved) >= MAX_RESOLVED_HITS:
+                self._resolved.clear()
+            self._resolved[key] = result
+        return list(result)
+
+
+@lru_cache(maxsize=32)
+def _compile(tags):
+    return TagMatcher(tags)
+
+
+def get_tag_matcher(tags):
+    """Build the matcher once per tag set and reuse it across fetches"""
+    return _compile(tuple(tags))
+
+
+# --- Question-title detection ---
+QUESTION_WORDS = (
+    "what", "do you", "does", "did", "how", "why", "have you", "has anyone",
+    "can you", "is", "are", "who", "when", "where", "will", "should", "could"
+)
+
+QUESTION_PREFIX = re.compile("|".join(re.escape(qw) for qw in QUESTION_WORDS))
+
+
+# --- Server-side search queries ---
+SEARCH_QUERY_MAX_LENGTH = 512  # Reddit rejects longer search queries
+
+
+@lru_cache(maxsize=32)
+def _search_queries(tags, max_length):
+    queries = []
+    current = []
+    for tag in dict.fromkeys(tag.lower() for tag in tags if tag):
+        term = f'title:"{tag}"'
+        candidate = " OR ".join(current + [term])
+        if current and len(candidate) > max_length:
+            queries.append(" OR ".join(current))
+            current = [term]
+        else:
+            current.append(term)
+    if current:
+        queries.append(" OR ".join(current))
+    return queries
+
+
+def build_search_queries(tags, max_length=SEARCH_QUERY_MAX_LENGTH):
+    """Batch tags into as few OR'ed title: queries as fit under Reddit's length limit"""
+    return _search_queries(tuple(tags), max_length)
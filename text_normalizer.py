@@ -0,0 +1,133 @@
+import hashlib
+import html
+import re
+import threading
+from pathlib import Path
+
+from json_files import load_json, atomic_write_json
+
+# --- Normalizer configuration ---
+NORMALIZED_CACHE_FILE = "normalized_text_cache.json"
+RULES_VERSION = 1  # Bump when the rules change so cached results are recomputed
+
+# Whole lines of BoRU / repost boilerplate that should never be narrated
+_BOILERPLATE_LINE_RE = re.compile(
+    r"^[\s>*_#]*(?:"
+    r"(?:reminder\W*)?i\s*(?:am|'m)\s*not\s*(?:the\s*)?(?:oop|op\b|original\s*poster)"
+    r"|(?:oop|op)\s*is\s*u/"
+    r"|originally\s*posted"
+    r"|thanks?\s*(?:you\s*)?(?:to|for)\s*(?:u/|the\s*rec)"
+    r"|editor'?s?\s*note"
+    r"|do\s*not\s*comment\s*on"
+    r"|(?:mood|content|trigger)\s*(?:spoiler|warning)s?"
+    r"|(?:previous|original|og|first|latest|last|next)\s*(?:post|update|boru)s?\s*[:\-]?\s*(?:\[|https?://)"
+    r"|concluded\s*as\s*of"
+    r").*$",
+    re.IGNORECASE | re.MULTILINE)
+
+# Lines that are only a link, e.g. "[BoRU 1](https://...)" or "Original post: https://..."
+_LINK_ONLY_LINE_RE = re.compile(
+    r"^[\s*_#>]*[\w .:'#-]{0,30}[:\-]?\s*(?:\[[^\]\n]*\]\([^)\n]*\)|https?://\S+)[\s*_.:]*$",
+    re.MULTILINE)
+_HORIZONTAL_RULE_RE = re.compile(r"^\s*(?:[-*_]\s*){3,}$", re.MULTILINE)
+
+# Inline markdown -> the words a reader would actually hear
+_INLINE_RULES = (
+    (re.compile(r"\[([^\]\n]*)\]\([^)\n]*\)"), r"\1"),  # [text](url) -> text
+    (re.compile(r">!(.*?)!<", re.DOTALL), r"\1"),  # >!spoiler!< -> spoiler
+    (re.compile(r"https?://\S+|www\.\S+"), ""),  # Bare URLs
+    (re.compile(r"(\*\*|__)(.+?)\1", re.DOTALL), r"\2"),  # **bold** / __bold__
+    (re.compile(r"(?<![\w*])\*(?!\s)([^*\n]+?)\*(?![\w*])"), r"\1"),  # *italic*
+    (re.compile(r"~~(.+?)~~", re.DOTALL), r"\1"),  # ~~strike~~
+    (re.compile(r"\^\(([^)\n]*)\)"), r"\1"),  # ^(superscript)
+    (re.compile(r"^\s{0,3}#{1,6}\s*", re.MULTILINE), ""),  # # headers
+    (re.compile(r"^\s*>\s?", re.MULTILINE), ""),  # > quotes
+    (re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+", re.MULTILINE), ""),  # List bullets
+    (re.compile(r"\\([\\`*_{}\[\]()#+\-.!>~^|])"), r"\1"),  # \_ escapes
+    (re.compile(r"[​‌‍﻿]"), ""),  # Zero-width spaces (&#x200B; paragraph padding)
+    (re.compile(r"\*{2,}"), ""),  # Unpaired bold markers left over from truncated text
+)
+
+# BoRU section headers such as "Original Post: October 29, 2023" (checked after links are unwrapped)
+_DATE_HEADER_LINE_RE = re.compile(
+    r"^[\w ]{0,30}(?:post|update)[\w ]{0,10}:?\s*\(?[a-z]+\.? \d{1,2}(?:st|nd|rd|th)?,? \d{4}\)?\s*$",
+    re.IGNORECASE | re.MULTILINE)
+_SPACES_RE = re.compile(r"[ \t]+")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r" +([.,!?;:])")
+_EMPTY_PUNCT_LINE_RE = re.compile(r"^[\s.:;,!?-]*$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def normalize_text(text):
+    """Reddit markdown -> plain narration text (no links, formatting or repost boilerplate)"""
+    if not text:
+        return ""
+    text = html.unescape(text.replace("\r\n", "\n"))
+    text = _BOILERPLATE_LINE_RE.sub("", text)
+    text = _LINK_ONLY_LINE_RE.sub("", text)
+    text = _HORIZONTAL_RULE_RE.sub("", text)
+    for pattern, replacement in _INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    text = _DATE_HEADER_LINE_RE.sub("", text)
+
+    text = _SPACES_RE.sub(" ", text)
+    text = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+    text = _EMPTY_PUNCT_LINE_RE.sub("", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.strip().split("\n"))
+
+
+# --- Cached normalizer: each distinct text is normalized once, ever ---
+class TextNormalizer:
+    """normalize_text with results cached on disk by content hash"""
+
+    def __init__(self, path=NORMALIZED_CACHE_FILE):
+        self.path = Path(path) if path else None
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path or not self.path.exists():
+            return
+        data = load_json(self.path, {}, "normalized text cache")
+        if data.get("rules_version") == RULES_VERSION:
+            self.cache = data.get("texts", {})
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            atomic_write_json(self.path, {"rules_version": RULES_VERSION, "texts": self.cache}, ensure_ascii=False)
+            self._dirty = False
+
+    def normalize(self, text):
+        if not text:
+            return ""
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        normalized = normalize_text(text)
+        with self._lock:
+            self.cache[key] = normalized
+            self.misses += 1
+            self._dirty = True
+        return normalized
+
+    def normalize_story(self, story):
+        """Copy of the story with narration-ready title and full_story (raw text kept as raw_*)"""
+        normalized = dict(story)
+        for field in ('title', 'full_story'):
+            raw = story.get(field) or ''
+            clean = self.normalize(raw)
+            if clean != raw:
+                normalized[f'raw_{field}'] = raw
+                normalized[field] = clean
+        return normalized
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from json_files import load_json, atomic_write_json
+
+# --- TTS cache configuration ---
+TTS_CACHE_DIR = "tts_cache"
+TTS_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Least recently used audio is evicted past this size
+
+
+def tts_cache_key(text, voice, rate, volume, engine_version):
+    """Content address of one synthesized utterance - any change to text or voice settings misses"""
+    payload = json.dumps([" ".join(text.split()), voice, rate, round(volume, 3), engine_version],
+                         ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+# --- Persistent, content-addressed TTS audio store ---
+class TTSCache:
+    """Synthesized audio plus its measured duration, shared across runs, LRU-evicted to a size cap"""
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._pinned = set()  # Keys in use by the story being rendered - never evicted
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.index_path.exists():
+            return
+        self.entries = load_json(self.index_path, {}, "TTS cache index")
+
+    def save(self):
+        if not self._dirty:
+            return
+        with self._lock:
+            atomic_write_json(self.index_path, self.entries)
+            self._dirty = False
+
+    def _audio_path(self, key, suffix=".wav"):
+        return self.cache_dir / f"{key}{suffix}"
+
+    def get(self, key, count=True):
+        """(audio path, duration seconds) on a hit, else None (count=False: don't add to hits / misses)"""
+        with self._lock:
+            entry = self.entries.get(key)
+            path = self._audio_path(key, entry.get("suffix", ".wav")) if entry else None
+            if entry is None or not path.exists():
+                if entry is not None:
+                    del self.entries[key]  # Audio deleted behind our back
+                    self._dirty = True
+                self.misses += count
+                return None
+            entry["last_used"] = time.time()
+            self._dirty = True
+            self.hits += count
+            return str(path), entry["duration"]
+
+    def put(self, key, source_path, duration):
+        """Move freshly synthesized audio into the cache -> its cached path"""
+        source_path = Path(source_path)
+        path = self._audio_path(key, source_path.suffix or ".wav")
+        os.replace(source_path, path)
+        with self._lock:
+            self.entries[key] = {
+                "duration": duration,
+                "size": path.stat().st_size,
+                "suffix": path.suffix,
+                "last_used": time.time(),
+            }
+            self._dirty = True
+            self._evict(keep=key)
+        return str(path)
+
+    @contextmanager
+    def pinned(self, keys):
+        """Keep these keys' audio out of eviction until the block ends (e.g. while a story is assembled)"""
+        keys = [key for key in keys if key not in self._pinned]
+        with self._lock:
+            self._pinned.update(keys)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pinned.difference_update(keys)
+
+    def _evict(self, keep=None):
+        total = sum(entry["size"] for entry in self.entries.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep or key in self._pinned:
+                continue
+            entry = self.entries.pop(key)
+            total -= entry["size"]
+            self.evicted += 1
+            try:
+                self._audio_path(key, entry.get("suffix", ".wav")).unlink()
+            except OSError:
+                pass
+
+    def size_bytes(self):
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def report(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        print(f"\n🗄️ TTS cache: {self.hits} hits, {self.misses} misses ({self.hits / lookups:.0%} hit rate), "
+              f"{len(self.entries)} entries, {self.size_bytes() / 1024 ** 2:.1f} MB"
+              + (f", {self.evicted} evicted" if self.evicted else ""))
@@ -0,0 +1,97 @@
+import os
+
+from audio_meta import audio_duration
+
+# --- TTS pool configuration ---
+TTS_WORKERS = min(8, os.cpu_count() or 1)
+BATCHES_PER_WORKER = 2  # Jobs are sent in ordered batches: one runAndWait per batch, not per chunk
+VOICE_HINTS = ("zira", "female")
+
+
+def default_engine_factory():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+def configure_engine(engine, rate, volume, voice_hints=VOICE_HINTS):
+    """Rate, volume and the preferred (female) voice - shared by the pool and in-process TTS"""
+    engine.setProperty('rate', rate)
+    engine.setProperty('volume', volume)
+
+    # Select female voice
+    for voice in engine.getProperty('voices'):
+        if voice and hasattr(voice, 'name'):
+            if any(hint in voice.name.lower() for hint in voice_hints):
+                engine.setProperty('voice', voice.id)
+                break
+    return engine
+
+
+def wav_duration(path):
+    try:
+        return audio_duration(path)
+    except Exception:
+        return None
+
+
+# --- Worker side: one engine per process, only ever driven from that process's main thread ---
+_engine = None
+
+
+def _init_worker(engine_factory, rate, volume, voice_hints):
+    global _engine
+    _engine = configure_engine(engine_factory(), rate, volume, voice_hints)
+
+
+def _synthesize_batch(jobs):
+    """Queue every (text, path) job of the batch, then run the engine's event loop once"""
+    for text, path in jobs:
+        _engine.save_to_file(text, str(path))
+    _engine.runAndWait()
+    return [(str(path), wav_duration(path)) for _, path in jobs]
+
+
+# --- Pool ---
+class TTSPool:
+    """Process pool of pyttsx3 engines - jobs go out in ordered batches and come back in order
+
+    pyttsx3 engines are neither thread safe nor fork safe (COM / NSSpeech / espeak
+    event loops), so workers are spawned fresh and each builds its own engine once.
+    """
+
+    def __init__(self, rate, volume, workers=TTS_WORKERS, voice_hints=VOICE_HINTS,
+                 engine_factory=default_engine_factory):
+        # Imported here: multiprocessing + concurrent.futures would add ~20 ms to every import of this module
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.workers = max(1, workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(engine_factory, rate, volume, voice_hints),
+        )
+
+    def synthesize(self, jobs):
+        """[(text, output_path), ...] -> [(output_path, duration seconds or None), ...] in job order"""
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        batch_count = min(len(jobs), self.workers * BATCHES_PER_WORKER)
+        size = -(-len(jobs) // batch_count)
+        batches = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+        results = []
+        for batch_result in self._executor.map(_synthesize_batch, batches):
+            results.extend(batch_result)
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,116 @@
+import wave
+
+# --- Pause detection configuration ---
+ENERGY_WINDOW = 0.01  # Seconds per energy window
+SILENCE_RATIO = 0.03  # Window is silent below this fraction of the part's loud (95th pct) level
+MIN_PAUSE = 0.08  # Shortest silence that can separate two chunks
+PAUSE_WEIGHT = 1.0  # Seconds of timing error a 1 s pause is worth: prefers real sentence breaks
+
+
+def read_wav_mono(path):
+    """(float32 mono samples, sample rate) from a PCM WAV - numpy ships with moviepy"""
+    import numpy as np
+
+    with wave.open(str(path), 'rb') as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        frames = w.readframes(w.getnframes())
+
+    if width == 1:
+        samples = np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32)
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width * 8} bit")
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def find_pauses(samples, rate):
+    """Silent stretches [(start_s, end_s), ...] inside the utterance (leading / trailing silence excluded)"""
+    import numpy as np
+
+    window = max(1, int(rate * ENERGY_WINDOW))
+    count = len(samples) // window
+    if count == 0:
+        return []
+    energy = np.abs(samples[:count * window]).reshape(count, window).mean(axis=1)
+    loud = np.percentile(energy, 95)
+    if loud <= 0:
+        return []
+    silent = energy < loud * SILENCE_RATIO
+
+    # Run boundaries of the silent mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    pauses = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if start == 0 or end == count:
+            continue
+        if (end - start) * ENERGY_WINDOW >= MIN_PAUSE:
+            pauses.append((float(start * ENERGY_WINDOW), float(end * ENERGY_WINDOW)))
+    return pauses
+
+
+def align_boundaries(pauses, expected):
+    """Pick one pause per expected chunk boundary, in order, minimizing timing error
+
+    DP over (boundary, pause): cost is |pause midpoint - expected time| minus a
+    bonus for longer pauses. Returns the chosen boundary times, or None when
+    there are fewer pauses than boundaries.
+    """
+    k, m = len(expected), len(pauses)
+    if k == 0:
+        return []
+    if m < k:
+        return None
+
+    mids = [(start + end) / 2 for start, end in pauses]
+    lengths = [end - start for start, end in pauses]
+    inf = float('inf')
+
+    # best[j] = cost of matching expected[:i+1] with expected[i] on pause j
+    best = [abs(mids[j] - expected[0]) - PAUSE_WEIGHT * lengths[j] for j in range(m)]
+    back = []
+    for i in range(1, k):
+        choice, prefix_cost, prefix_arg = [0] * m, inf, -1
+        current = [inf] * m
+        for j in range(m):
+            if j > 0 and best[j - 1] < prefix_cost:
+                prefix_cost, prefix_arg = best[j - 1], j - 1
+            if prefix_arg >= 0:
+                current[j] = prefix_cost + abs(mids[j] - expected[i]) - PAUSE_WEIGHT * lengths[j]
+                choice[j] = prefix_arg
+        back.append(choice)
+        best = current
+
+    j = min(range(m), key=lambda idx: best[idx])
+    chosen = [j]
+    for choice in reversed(back):
+        j = choice[j]
+        chosen.append(j)
+    chosen.reverse()
+    return [mids[j] for j in chosen]
+
+
+def chunk_spans(wav_path, predicted_seconds):
+    """(start, end) seconds of every chunk inside one utterance WAV
+
+    Chunk boundaries are snapped to the pauses in the PCM nearest to where the
+    speech-rate model expects them (scaled to the real utterance length).
+    """
+    samples, rate = read_wav_mono(wav_path)
+    total = len(samples) / rate
+    if len(predicted_seconds) <= 1:
+        return [(0.0, total)]
+
+    scale = total / max(1e-6, sum(predicted_seconds))
+    expected, t = [], 0.0
+    for seconds in predicted_seconds[:-1]:
+        t += seconds * scale
+        expected.append(t)
+
+    boundaries = align_boundaries(find_pauses(samples, rate), expected) or expected
+    edges = [0.0] + boundaries + [total]
+    return list(zip(edges[:-1], edges[1:]))